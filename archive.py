@@ -0,0 +1,254 @@
+import os
+import numpy as np
+import pandas as pd
+from search import tokenize
+
+# File layout (little-endian, every section 8-byte aligned). Rows are
+# sorted by date, so the archive is its own date index:
+#   header        MAGIC, then int64 rows, categories, notes, note heap bytes,
+#                 category heap bytes, noted rows, tokens, token heap bytes,
+#                 postings
+#   dates         int64[rows]           ns since the epoch, NaT (int64 min) first
+#   cents         int64[rows]
+#   cumsum        int64[rows + 1]       prefix sums of cents
+#   codes         uint16[rows]          category ids, MISSING for none
+#   note_codes    int32[rows]           distinct-note ids, -1 for none
+#   note_offs     int64[notes + 1]      note i is notes[note_offs[i]:note_offs[i + 1]]
+#   notes         uint8[note heap bytes], UTF-8, each distinct note once
+#   note_rows     int64[noted rows]     rows grouped by note id
+#   note_bounds   int64[notes + 1]      note i is on note_rows[note_bounds[i]:note_bounds[i + 1]]
+#   cat_offs      int64[categories + 1]
+#   cat_names     uint8[category heap bytes], UTF-8
+#   token_offs    int64[tokens + 1]     sorted note tokens
+#   tokens        uint8[token heap bytes], UTF-8
+#   posting_offs  int64[tokens + 1]     token i is in postings[posting_offs[i]:posting_offs[i + 1]]
+#   postings      int32[postings]       distinct-note ids
+MAGIC = b'EXPARCH2'
+HEADER = 8 + 9 * 8
+MISSING = np.iinfo(np.uint16).max
+
+class Archive():
+    '''
+    Read-only ledger of closed periods in a fixed-width binary columnar
+    file, memory-mapped on open.
+
+    Dates, amounts, their prefix sums and category ids are used straight
+    from the mapping with no parsing. Notes are stored once per distinct
+    note along with their search postings, so only the distinct notes are
+    decoded and the archived rows are never indexed again. The file is
+    written once by write() and never modified.
+    '''
+
+    def __init__(self, path):
+        '''
+        Parameters
+        ----------
+        path : str
+            Archive file written by write().
+        '''
+        self.path = path
+        # A plain array over the mapping: slicing a memmap is much slower.
+        buf = np.memmap(path, dtype=np.uint8, mode='r').view(np.ndarray)
+        if bytes(buf[:8]) != MAGIC:
+            raise ValueError(f"{path} is not a ledger archive")
+        rows, ncats, nnotes, heap, cat_heap, noted, ntokens, token_heap, npostings = \
+            buf[8:HEADER].view(np.int64)
+        sections = {}
+        pos = HEADER
+        for name, dtype, count in (('dates', np.int64, rows), ('cents', np.int64, rows),
+                                   ('cumsum', np.int64, rows + 1), ('codes', np.uint16, rows),
+                                   ('note_codes', np.int32, rows), ('note_offs', np.int64, nnotes + 1),
+                                   ('notes', np.uint8, heap), ('note_rows', np.int64, noted),
+                                   ('note_bounds', np.int64, nnotes + 1),
+                                   ('cat_offs', np.int64, ncats + 1), ('cat_names', np.uint8, cat_heap),
+                                   ('token_offs', np.int64, ntokens + 1), ('tokens', np.uint8, token_heap),
+                                   ('posting_offs', np.int64, ntokens + 1),
+                                   ('postings', np.int32, npostings)):
+            size = int(count) * np.dtype(dtype).itemsize
+            sections[name] = buf[pos:pos + size].view(dtype)
+            pos += _aligned(size)
+        self.rows = int(rows)
+        self.dates = sections['dates']
+        self.cents = sections['cents']
+        self.cumsum = sections['cumsum']
+        self.codes = sections['codes']
+        self.note_codes = sections['note_codes']
+        self.categories = _decode(sections['cat_offs'], sections['cat_names'])
+        self._sections = sections
+        self._notes = None
+        self._buf = buf
+
+    def __len__(self):
+        return self.rows
+
+    def notes(self):
+        '''
+        Returns
+        -------
+        type: list of str
+            The distinct notes, by note id. Decoded on first use.
+        '''
+        if self._notes is None:
+            self._notes = _decode(self._sections['note_offs'], self._sections['notes'])
+        return self._notes
+
+    def postings(self):
+        '''
+        The saved note index, in the arguments order of
+        search.NoteIndex.from_postings().
+
+        Returns
+        -------
+        type: tuple
+            Distinct notes, rows grouped by note and their bounds, the
+            sorted tokens, and the bounds and ids of their postings.
+        '''
+        sections = self._sections
+        return (self.notes(), sections['note_rows'], sections['note_bounds'],
+                _decode(sections['token_offs'], sections['tokens']),
+                sections['posting_offs'], sections['postings'])
+
+    def frame(self, compact_notes=False):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            The archived entries in the schema.enforce() layout, by date.
+        '''
+        codes = self.codes.astype(np.int32)
+        codes[self.codes == MISSING] = -1
+        if compact_notes:
+            notes = pd.Categorical.from_codes(self.note_codes, self.notes())
+        else:
+            # Each distinct note is decoded once and shared by its rows.
+            notes = pd.array(self.notes(), dtype='string').take(self.note_codes, allow_fill=True)
+        return pd.DataFrame({
+            'Ammount': pd.Series(self.cents, copy=False),
+            'Date': pd.Series(self.dates.view('datetime64[ns]'), copy=False),
+            'Category': pd.Categorical.from_codes(codes, self.categories),
+            'Notes': notes,
+        }, index=pd.RangeIndex(self.rows))
+
+    def close(self):
+        # Views handed out by frame() and postings() keep the mapping
+        # alive until freed.
+        self._buf = self.dates = self.cents = self.cumsum = self.codes = self.note_codes = None
+        self._sections = self._notes = None
+
+
+def write(path, data):
+    '''
+    Writes an archive, sorted by date. The file is written next to path
+    and moved into place, so an existing archive is only replaced once the
+    new one is complete.
+
+    Parameters
+    ----------
+    path : str
+        Archive file.
+    data : Pandas Dataframe
+        Entries in the schema.enforce() layout.
+    '''
+    dates = data['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    order = np.argsort(dates, kind='stable')
+    dates = dates[order]
+    cents = data['Ammount'].to_numpy(dtype=np.int64)[order]
+
+    categories = pd.Categorical(data['Category'])
+    if len(categories.categories) >= MISSING:
+        raise ValueError(f"An archive holds at most {MISSING - 1} categories")
+    codes = categories.codes[order].astype(np.uint16)
+    codes[categories.codes[order] < 0] = MISSING
+    cat_offs, cat_names = _encode(pd.Series(categories.categories, dtype=object))
+
+    # Missing and empty notes are both stored as none, as in the CSV.
+    notes = data['Notes'].astype(object).to_numpy()[order]
+    note_codes, uniques = pd.factorize(np.where([isinstance(n, str) and n != '' for n in notes],
+                                                notes, None))
+    note_codes = note_codes.astype(np.int32)
+    note_offs, note_heap = _encode(pd.Series(uniques, dtype=object))
+    grouped = np.argsort(note_codes, kind='stable')
+    note_bounds = np.searchsorted(note_codes[grouped], np.arange(len(uniques) + 1))
+    note_rows = grouped[note_bounds[0]:]
+    note_bounds = note_bounds - note_bounds[0]
+
+    postings = {}
+    for note_id, note in enumerate(uniques):
+        for token in set(tokenize(note)):
+            postings.setdefault(token, []).append(note_id)
+    tokens = sorted(postings)
+    token_offs, token_heap = _encode(pd.Series(tokens, dtype=object))
+    posting_offs = np.zeros(len(tokens) + 1, dtype=np.int64)
+    np.cumsum([len(postings[token]) for token in tokens], out=posting_offs[1:])
+    posting_ids = np.fromiter((i for token in tokens for i in postings[token]),
+                              dtype=np.int32, count=int(posting_offs[-1]))
+
+    header = np.array([len(data), len(categories.categories), len(uniques), len(note_heap),
+                       len(cat_names), len(note_rows), len(tokens), len(token_heap),
+                       len(posting_ids)], dtype=np.int64)
+    sections = [
+        dates,
+        cents,
+        np.concatenate(([0], np.cumsum(cents))),
+        codes,
+        note_codes,
+        note_offs,
+        note_heap,
+        note_rows.astype(np.int64),
+        note_bounds.astype(np.int64),
+        cat_offs,
+        cat_names,
+        token_offs,
+        token_heap,
+        posting_offs,
+        posting_ids,
+    ]
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(header.tobytes())
+        for section in sections:
+            raw = np.ascontiguousarray(section).tobytes()
+            f.write(raw)
+            f.write(b'\0' * (_aligned(len(raw)) - len(raw)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def open_archive(path):
+    '''
+    Returns
+    -------
+    type: Archive or None
+        The archive at path, or None when there is none.
+    '''
+    return Archive(path) if os.path.exists(path) else None
+
+def archive_path(path):
+    '''
+    Archive file kept next to a ledger: 'DATA.csv' gives 'DATA.archive',
+    a partitioned ledger 'DATA' gives 'DATA/archive.bin'.
+    '''
+    root, ext = os.path.splitext(path)
+    return os.path.join(path, 'archive.bin') if not ext else root + '.archive'
+
+def _aligned(size):
+    return -(-size // 8) * 8
+
+def _encode(strings):
+    # Missing and empty strings are both stored as empty, as in the CSV.
+    encoded = [s.encode() if isinstance(s, str) else b'' for s in strings.astype(object)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+def _decode(offsets, heap):
+    # Decodes the whole heap once and slices it. Byte offsets become
+    # character offsets by discounting the UTF-8 continuation bytes before
+    # them.
+    text = heap.tobytes().decode()
+    if len(text) != len(heap):
+        continuation = np.concatenate(([0], np.cumsum((heap & 0xC0) == 0x80)))
+        offsets = offsets - continuation[offsets]
+    bounds = offsets.tolist()
+    return [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,295 @@
+import json
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from manager import Manager
+from storage import STORAGES
+
+def bench_inserts(sizes=(1000, 10000, 100000)):
+    '''
+    Times add_entry for a growing number of inserts and prints the cost per
+    insert, which should stay flat if inserts scale linearly.
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            manager = Manager(path=os.path.join(tmp, 'bench.csv'))
+            start = time.perf_counter()
+            for i in range(n):
+                manager.add_entry(i % 100 + 1, '2024-01-01', 'Food', '')
+            manager.get_Dataframe()
+            elapsed = time.perf_counter() - start
+            print(f"add_entry x{n:>8}: {elapsed:8.3f}s  {elapsed / n * 1e6:8.2f} us/insert")
+
+            manager = Manager(path=os.path.join(tmp, 'bench.csv'))
+            rows = ((i % 100 + 1, '2024-01-01', 'Food', '') for i in range(n))
+            start = time.perf_counter()
+            manager.add_entries(rows)
+            manager.get_Dataframe()
+            elapsed = time.perf_counter() - start
+            print(f"add_entries x{n:>6}: {elapsed:8.3f}s  {elapsed / n * 1e6:8.2f} us/insert")
+
+def bench_memory(rows=1_000_000):
+    '''
+    Compares bytes per row of the ledger as read by plain pd.read_csv
+    against Manager's compact schema, with and without compact notes.
+    '''
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        'Ammount': rng.integers(1, 100_000, rows) / 100,
+        'Date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 5 * 365 * 86400, rows), unit='s'),
+        'Category': rng.choice(['Food', 'Transport', 'Entertainment', 'Utilities', 'Other'], rows),
+        'Notes': rng.choice(['lunch', 'bus ticket', 'groceries', 'rent', ''], rows),
+    })
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.csv')
+        data.to_csv(path, index=False)
+
+        before = pd.read_csv(path, dtype={'Date': object, 'Category': object, 'Notes': object})
+        print(f"read_csv (object columns): {before.memory_usage(deep=True, index=False).sum() / rows:7.1f} bytes/row")
+        for compact_notes in (False, True):
+            report = Manager(path=path, compact_notes=compact_notes).memory_report()
+            columns = ', '.join(f"{col} {report[col]:.1f}" for col in ('Ammount', 'Date', 'Category', 'Notes'))
+            print(f"Manager(compact_notes={compact_notes!s:5}): {report['total']:7.1f} bytes/row ({columns})")
+
+def make_ledger(rows, categories=8, start='2020-01-01', days=5 * 365, note_words=(1, 4),
+                distinct_notes=10_000, seed=0):
+    '''
+    Generates a reproducible synthetic ledger.
+
+    Parameters
+    ----------
+    rows : int
+        Number of entries.
+    categories : int or list of str
+        Number of categories (named "Category 0", ...) or their names.
+        Categories are picked with a skewed (Zipf-like) frequency.
+    start : str
+        Date of the earliest possible entry.
+    days : int
+        Span of the dates, in days.
+    note_words : tuple
+        (min, max) number of words per note.
+    distinct_notes : int
+        Size of the pool notes are drawn from; real ledgers repeat notes.
+    seed : int
+        Random seed; the same arguments always give the same ledger.
+
+    Returns
+    -------
+    type: Pandas Dataframe
+        Ledger with amounts in dollars.
+    '''
+    rng = np.random.default_rng(seed)
+    if isinstance(categories, int):
+        categories = [f"Category {i}" for i in range(categories)]
+    weights = 1 / np.arange(1, len(categories) + 1)
+    vocabulary = np.array([''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz'), rng.integers(3, 10)))
+                           for _ in range(500)])
+    lengths = rng.integers(note_words[0], note_words[1] + 1, distinct_notes)
+    notes = np.array([' '.join(rng.choice(vocabulary, n)) for n in lengths], dtype=object)
+    return pd.DataFrame({
+        'Ammount': rng.integers(1, 50_000, rows) / 100,
+        'Date': pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit='s'),
+        'Category': np.asarray(categories, dtype=object)[
+            rng.choice(len(categories), rows, p=weights / weights.sum())],
+        'Notes': notes[rng.integers(0, distinct_notes, rows)],
+    })
+
+SUITE_SIZES = (1_000, 100_000, 1_000_000, 10_000_000)
+SUITE_BASELINE = 'bench_baseline.json'
+# A metric is flagged when it is this much worse than the baseline, and by
+# more than the noise floor (seconds, or MB for peak_mb).
+REGRESSION_TOLERANCE = 0.25
+NOISE_FLOOR = {'peak_mb': 5.0}
+DEFAULT_NOISE_FLOOR = 0.001
+
+def bench_suite(sizes=SUITE_SIZES, fmt='.csv', baseline=SUITE_BASELINE, save=False, seed=0):
+    '''
+    Times the main Manager operations on synthetic ledgers of growing size.
+
+    Each size runs in a fresh process, so its peak memory (max RSS) is its
+    own. Results are compared with the stored baseline and regressions
+    beyond REGRESSION_TOLERANCE are flagged.
+
+    Parameters
+    ----------
+    sizes : tuple of int
+        Ledger sizes in rows.
+    fmt : str
+        Ledger file format: '.csv', '.parquet' or '.feather'.
+    baseline : str
+        JSON file holding the baseline results.
+    save : bool
+        Store these results as the new baseline.
+    seed : int
+        Seed of the synthetic ledgers.
+
+    Returns
+    -------
+    type: dict
+        Seconds per operation (and peak_mb) keyed by rows and format,
+        e.g. '100000.csv'.
+    '''
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"ledger{fmt}")
+            STORAGES[fmt](path).save(make_ledger(rows, seed=seed))
+            with context.Pool(1) as pool:
+                results[f"{rows}{fmt}"] = timings = pool.apply(_suite_run, (path,))
+            os.remove(path)
+            _print_suite(rows, timings)
+
+    previous = {}
+    if os.path.exists(baseline):
+        with open(baseline) as f:
+            previous = json.load(f)
+    regressions = [
+        (key, metric, old, new)
+        for key, metrics in results.items() if key in previous
+        for metric, new in metrics.items()
+        for old in [previous[key].get(metric)]
+        if old and new > old * (1 + REGRESSION_TOLERANCE)
+        and new - old > NOISE_FLOOR.get(metric, DEFAULT_NOISE_FLOOR)
+    ]
+    for key, metric, old, new in regressions:
+        print(f"REGRESSION {key:>16} {metric:<20} {old:10.4g} -> {new:10.4g} (+{(new / old - 1) * 100:.0f}%)")
+    if any(key in previous for key in results) and not regressions:
+        print(f"No regressions against {baseline}")
+
+    if save:
+        with open(baseline, 'w') as f:
+            json.dump({**previous, **results}, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {baseline}")
+    return results
+
+def _suite_run(path, repeats=100, inserts=1000):
+    # Runs in a child process; returns seconds per operation.
+    timings = {}
+
+    start = time.perf_counter()
+    manager = Manager(path=path)
+    timings['load'] = time.perf_counter() - start
+    rows = manager.get_count()
+
+    rng = np.random.default_rng(1)
+    categories = list(manager.get_category_totals().index)
+    start = time.perf_counter()
+    for cat in rng.choice(categories, repeats):
+        manager.get_Amount_Category(cat)
+    timings['get_Amount_Category'] = (time.perf_counter() - start) / repeats
+
+    first, last = manager.date_index.min(), manager.date_index.max()
+    bounds = first + (last - first) * np.sort(rng.random((repeats, 2)), axis=1)
+    start = time.perf_counter()
+    for lo, hi in bounds:
+        manager.get_Amount_Date(lo, hi)
+    timings['get_Amount_Date'] = (time.perf_counter() - start) / repeats
+
+    for name in ('sort_by_Date', 'sort_by_cat', 'sort_by_Amount'):
+        start = time.perf_counter()
+        getattr(manager, name)()
+        timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(inserts):
+        manager.add_entry(i % 100 + 1, last, categories[i % len(categories)], 'bench')
+    timings['add_entry'] = (time.perf_counter() - start) / inserts
+
+    start = time.perf_counter()
+    manager.export()
+    timings['export'] = time.perf_counter() - start
+
+    timings['peak_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    timings['rows'] = rows
+    return timings
+
+def _print_suite(rows, timings):
+    print(f"{rows:>10,} rows")
+    for metric in ('load', 'export'):
+        seconds = timings[metric]
+        print(f"  {metric:<20} {seconds:9.3f} s    {rows / seconds:14,.0f} rows/s")
+    for metric in ('add_entry', 'get_Amount_Category', 'get_Amount_Date',
+                   'sort_by_Date', 'sort_by_cat', 'sort_by_Amount'):
+        seconds = timings[metric]
+        print(f"  {metric:<20} {seconds * 1e3:9.3f} ms   {1 / seconds:14,.0f} ops/s")
+    print(f"  {'peak memory':<20} {timings['peak_mb']:9.1f} MB")
+
+# Run in a fresh interpreter: prints the seconds from interpreter start to
+# the dashboard's first paint, and whether pandas was imported by then.
+FIRST_PAINT_PROBE = '''
+import sys, time
+start = time.perf_counter()
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication
+from home import Home
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            print(time.perf_counter() - start, 'pandas' in sys.modules)
+            app.quit()
+        return False
+
+app = QApplication(sys.argv)
+home = Home()
+probe = FirstPaint()
+home.installEventFilter(probe)
+home.show()
+app.exec()
+'''
+
+def bench_startup(runs=5, top=10):
+    '''
+    Measures time-to-first-paint of the dashboard over a few cold runs,
+    then lists the slowest imports of main.py (python -X importtime).
+    Runs in an empty directory so no ledger is touched.
+    '''
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    with tempfile.TemporaryDirectory() as tmp:
+        times = []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, '-c', FIRST_PAINT_PROBE], cwd=tmp, env=env,
+                                    capture_output=True, text=True, check=True)
+            elapsed, pandas_loaded = result.stdout.split()[-2:]
+            times.append(float(elapsed))
+        print(f"first paint: median {np.median(times) * 1000:7.1f} ms, best {min(times) * 1000:7.1f} ms"
+              f"  (pandas imported before paint: {pandas_loaded})")
+
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=tmp, env=env,
+                                capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module importing them.
+        imports.append((int(cumulative), name[1:].rstrip()))
+    total = sum(us for us, name in imports if not name.startswith(' '))
+    print(f"import main: {total / 1000:7.1f} ms")
+    for us, name in sorted(imports, reverse=True)[:top]:
+        print(f"  {us / 1000:7.1f} ms  {name.strip()}")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['memory']:
+        bench_memory(*(int(n) for n in sys.argv[2:3]))
+    elif sys.argv[1:2] == ['suite']:
+        # python bench.py suite [sizes...] [.csv|.parquet|.feather] [--save]
+        args = sys.argv[2:]
+        sizes = tuple(int(n) for n in args if n.isdigit()) or SUITE_SIZES
+        fmt = next((a for a in args if a.startswith('.')), '.csv')
+        bench_suite(sizes, fmt, save='--save' in args)
+    elif sys.argv[1:2] == ['startup']:
+        bench_startup(*(int(n) for n in sys.argv[2:3]))
+    else:
+        sizes = tuple(int(n) for n in sys.argv[1:] if n != 'inserts') or (1000, 10000, 100000)
+        bench_inserts(sizes)
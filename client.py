@@ -0,0 +1,238 @@
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlencode
+import pandas as pd
+from schema import COLUMNS
+
+# Seconds the server holds an event poll open when nothing changes.
+EVENT_WAIT = 25
+
+class SortOrder():
+    '''
+    A sort order held by the server, returned by LedgerClient.sort_by_*
+    for get_page(..., order=), like the permutation Manager returns.
+    '''
+
+    def __init__(self, column, ascending, count):
+        self.column = column
+        self.ascending = ascending
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+class LedgerClient():
+    '''
+    Thin client for server.LedgerServer.
+
+    Mirrors the Manager methods the windows use, with the same return
+    types, so a LedgerService can hand one to them in place of a Manager
+    (see service.LedgerService). One keep-alive connection is reused for
+    every call; subscribe() polls the server's change events on a thread
+    of its own.
+    '''
+
+    def __init__(self, host='127.0.0.1', port=8765, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.conn = None
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.poller = None
+        self.closed = False
+
+    def _request(self, method, path, params=None, payload=None):
+        if params:
+            path += '?' + urlencode({k: v for k, v in params.items() if v is not None})
+        body = None if payload is None else json.dumps(payload, default=str)
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        with self.lock:
+            for attempt in (1, 2):
+                if self.conn is None:
+                    self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    self.conn.request(method, path, body, headers)
+                    response = self.conn.getresponse()
+                    data = json.loads(response.read() or b'null')
+                    break
+                except (ConnectionError, http.client.HTTPException):
+                    # The server may have dropped an idle connection; reads
+                    # are retried once, writes never (they may have landed).
+                    self.conn.close()
+                    self.conn = None
+                    if attempt == 2 or method != 'GET':
+                        raise
+        if response.status != 200:
+            raise RuntimeError(f"{method} {path}: {response.status} {data.get('error')}")
+        return data
+
+    #-------------------Getters------------------------------
+
+    @property
+    def total(self):
+        return self.get_stats()['total']
+
+    def get_Amount_Date(self, start=None, end=None):
+        return self._request('GET', '/totals/range', {'start': start, 'end': end})['total']
+
+    def get_category_totals(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            Indexed by Category, with the sum, count, min, max and last
+            columns, like Manager.get_category_totals.
+        '''
+        table = pd.DataFrame.from_dict(self._request('GET', '/totals/categories'), orient='index',
+                                       columns=['sum', 'count', 'min', 'max', 'last'])
+        table['last'] = pd.to_datetime(table['last'])
+        table.index.name = 'Category'
+        return table
+
+    def get_Amount_Category(self, cat):
+        totals = self._request('GET', '/totals/categories')
+        return totals.get(cat, {}).get('sum', 0)
+
+    def get_period_total(self, freq, date):
+        return self._request('GET', '/totals/period', {'freq': freq, 'date': str(date)})['total']
+
+    def get_page(self, offset, limit, order=None):
+        '''
+        Returns a slice of the ledger, like Manager.get_page.
+
+        Parameters
+        ----------
+        offset : int
+            Position of the first row.
+        limit : int
+            Maximum number of rows.
+        order : SortOrder, optional
+            Order from sort_by_*; insertion order when None.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            At most limit rows.
+        '''
+        params = {'offset': offset, 'limit': limit}
+        if order is not None:
+            params.update(sort=order.column, ascending='true' if order.ascending else 'false')
+        page = pd.DataFrame(self._request('GET', '/history', params)['entries'], columns=COLUMNS)
+        page['Date'] = pd.to_datetime(page['Date'])
+        return page
+
+    def get_count(self):
+        return self._request('GET', '/history', {'limit': 0})['count']
+
+    def get_stats(self):
+        stats = self._request('GET', '/stats')
+        for key in ('first', 'last'):
+            stats[key] = None if stats.get(key) is None else pd.Timestamp(stats[key])
+        return stats
+
+    def get_summary(self, weeks=4):
+        '''
+        Returns
+        -------
+        type: dict
+            Same keys and types as Manager.get_summary.
+        '''
+        summary = self._request('GET', '/summary', {'weeks': weeks})
+        categories = summary['categories']
+        weekly = summary['weekly']
+        return {
+            'total': summary['total'],
+            'daily_average': summary['daily_average'],
+            'top_category': tuple(summary['top_category']) if summary['top_category'] else None,
+            'categories': pd.Series([total for _, total in categories],
+                                    index=[cat for cat, _ in categories], dtype=float),
+            'weekly': pd.Series([total for _, total in weekly],
+                                index=pd.to_datetime([week for week, _ in weekly]), dtype=float),
+        }
+
+    #-----------------------Filters--------------------------
+
+    def sort_order(self, column, ascending=True):
+        return SortOrder(column, ascending, self.get_count())
+
+    def sort_by_Date(self, ascnding=True):
+        return self.sort_order('Date', ascnding)
+
+    def sort_by_cat(self, ascnding=True):
+        return self.sort_order('Category', ascnding)
+
+    def sort_by_Amount(self, ascnding=True):
+        return self.sort_order('Ammount', ascnding)
+
+    #-----------------------------Main functions------------------------
+
+    def add_entry(self, amount, date, cat, notes) -> None:
+        self.add_entries([(amount, date, cat, notes)])
+
+    def add_entries(self, entries) -> int:
+        '''
+        Sends many entries in one request; the server writes them in a
+        single batch.
+        '''
+        entries = [list(e) if not isinstance(e, dict) else e for e in entries]
+        return self._request('POST', '/entries', payload=entries)['added']
+
+    def export(self):
+        # The server saves every batch before answering.
+        pass
+
+    def subscribe(self, listener) -> None:
+        '''
+        Registers a listener told about every change to the ledger, with
+        the same events and keys as Manager.subscribe. It is called on the
+        client's polling thread.
+        '''
+        self.listeners.append(listener)
+        if self.poller is None:
+            self.poller = threading.Thread(target=self._poll_events, daemon=True)
+            self.poller.start()
+
+    def _poll_events(self):
+        # A connection of its own, since a poll stays open until a change.
+        events = LedgerClient(self.host, self.port, self.timeout + EVENT_WAIT)
+        after = None
+        while not self.closed:
+            try:
+                if after is None:
+                    after = events._request('GET', '/events')['last']
+                    continue
+                data = events._request('GET', '/events', {'after': after, 'timeout': EVENT_WAIT})
+            except (OSError, RuntimeError, http.client.HTTPException, ValueError):
+                # Server down or restarted: start over from its latest event.
+                after = None
+                time.sleep(1)
+                continue
+            if data['last'] < after:
+                after = None
+                continue
+            for change in data['events']:
+                keys = _event_keys(change['keys'])
+                for listener in self.listeners:
+                    listener(change['event'], keys)
+            after = data['last']
+        events.close()
+
+    def close(self):
+        self.closed = True
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+def _event_keys(keys):
+    # Back to the types Manager passes to its listeners.
+    keys = dict(keys)
+    for key in ('date', 'start', 'end'):
+        if key in keys:
+            keys[key] = pd.Timestamp(keys[key])
+    if 'categories' in keys:
+        keys['categories'] = set(keys['categories'])
+    return keys
@@ -0,0 +1,182 @@
+from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, QTableView,
+                              QHeaderView, QAbstractItemView)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PySide6.QtGui import QFont
+import sys
+from instrument import instrumented
+from service import get_service
+
+# Rows are pulled from the Manager one page at a time as the view scrolls.
+PAGE_SIZE = 200
+# New entries reload the table at most once per RELOAD_DELAY_MS.
+RELOAD_DELAY_MS = 100
+
+class HistoryModel(QAbstractTableModel):
+    HEADERS = ["Amount", "Date", "Category", "Notes"]
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.rows = []
+        self.total_rows = 0
+        self.order = None
+        self.sorters = {
+            0: manager.sort_by_Amount,
+            1: manager.sort_by_Date,
+            2: manager.sort_by_cat,
+        }
+        self.load_first_page()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() == 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.rows) < self.total_rows
+
+    @instrumented()
+    def fetchMore(self, parent=QModelIndex()):
+        start = len(self.rows)
+        page = self.manager.get_page(start, PAGE_SIZE, self.order)
+        if not len(page):
+            self.total_rows = start
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.rows.extend(format_rows(page))
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column not in self.sorters:
+            return
+        self.beginResetModel()
+        self.sort_column = column
+        self.sort_ascending = order == Qt.AscendingOrder
+        # The Manager hands back a cached permutation; the ledger is untouched.
+        self.order = self.sorters[column](self.sort_ascending)
+        self.load_first_page()
+        self.endResetModel()
+
+    @instrumented()
+    def reload(self):
+        self.beginResetModel()
+        if self.order is not None:
+            self.order = self.sorters[self.sort_column](self.sort_ascending)
+        self.load_first_page()
+        self.endResetModel()
+
+    def load_first_page(self):
+        self.total_rows = self.manager.get_count() if self.order is None else len(self.order)
+        self.rows = format_rows(self.manager.get_page(0, PAGE_SIZE, self.order))
+
+def format_rows(page):
+    # Pre-format a page once so data() is a plain list lookup while scrolling.
+    notes = page['Notes'].astype(object).where(page['Notes'].notna(), "")
+    return [
+        (f"${amount:,.2f}", date.strftime("%Y-%m-%d %H:%M"), str(cat), str(note))
+        for amount, date, cat, note in zip(page['Ammount'], page['Date'], page['Category'], notes)
+    ]
+
+class History(QWidget):
+    def __init__(self, manager=None):
+        super().__init__()
+        service = get_service()
+        self.manager = manager if manager is not None else service.wait()
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(RELOAD_DELAY_MS)
+        self.init_ui()
+        if self.manager is service.manager:
+            self.reload_timer.timeout.connect(self.model.reload)
+            service.entry_added.connect(self.schedule_reload)
+            service.range_changed.connect(self.schedule_reload)
+
+    @instrumented()
+    def init_ui(self):
+        self.setWindowTitle("Transaction History")
+        self.setGeometry(100, 100, 900, 600)
+        self.setStyleSheet("background-color: white;")
+
+        main_layout = QVBoxLayout()
+        main_layout.setSpacing(20)
+        main_layout.setContentsMargins(30, 30, 30, 30)
+
+        # Header
+        header_label = QLabel("Transaction History")
+        header_label.setFont(QFont("Arial", 24, QFont.Bold))
+        header_label.setStyleSheet("color: #212529;")
+        main_layout.addWidget(header_label)
+
+        # Table
+        self.model = HistoryModel(self.manager, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # Open unsorted, in insertion order: enabling sorting would
+        # otherwise sort by the first column straight away.
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().setSortIndicatorShown(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+        # Fixed row heights and column widths keep scrolling independent of
+        # the number of rows.
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(32)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for column, width in enumerate((120, 170, 150)):
+            self.table.setColumnWidth(column, width)
+        self.table.setStyleSheet("""
+            QTableView {
+                border: 1px solid #e9ecef;
+                border-radius: 8px;
+                gridline-color: #e9ecef;
+                font-size: 14px;
+                color: #212529;
+                alternate-background-color: #f8f9fa;
+                selection-background-color: #e9ecef;
+                selection-color: #212529;
+            }
+            QHeaderView::section {
+                background-color: #f8f9fa;
+                color: #495057;
+                padding: 8px;
+                border: none;
+                border-bottom: 2px solid #e9ecef;
+                font-weight: bold;
+            }
+        """)
+        main_layout.addWidget(self.table)
+
+        self.setLayout(main_layout)
+
+    def schedule_reload(self, *changed):
+        # Sorted orders and pages may shift anywhere, so the table reloads,
+        # but a burst of entries only reloads it once.
+        if not self.reload_timer.isActive():
+            self.reload_timer.start()
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+
+    history_window = History()
+    history_window.show()
+
+    sys.exit(app.exec())
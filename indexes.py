@@ -0,0 +1,515 @@
+import datetime
+import numpy as np
+import pandas as pd
+
+def to_ns(date):
+    '''
+    Converts a date-like value to int64 nanoseconds since the epoch.
+    '''
+    return pd.Timestamp(date).as_unit('ns').value
+
+
+class DateIndex():
+    '''
+    Sorted date index with a prefix-sum of amounts (integer cents).
+
+    A date-range total is two binary searches and a subtraction. New entries
+    go to a small unsorted tail that is scanned directly and merged into the
+    sorted arrays once it grows past roughly sqrt(n), so inserts stay cheap
+    without ever re-sorting on every add.
+    '''
+
+    def __init__(self, dates=None, amounts=None):
+        '''
+        Parameters
+        ----------
+        dates : array-like of datetime64
+            Entry dates. NaT entries are ignored.
+        amounts : array-like of int
+            Entry amounts in cents, aligned with dates.
+        '''
+        if dates is None:
+            dates, amounts = [], []
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[ns]').view('i8')
+        amounts = np.asarray(amounts, dtype=np.int64)
+        valid = dates != np.iinfo(np.int64).min
+        self._build(dates[valid], amounts[valid])
+
+    @classmethod
+    def from_sorted(cls, dates, amounts, cumsum):
+        '''
+        Wraps arrays that are already sorted by date, such as an
+        archive's, without copying or sorting them.
+
+        Parameters
+        ----------
+        dates : numpy array of int64
+            Sorted entry dates in ns; NaT entries (int64 min) come first.
+        amounts : numpy array of int64
+            Entry amounts in cents, aligned with dates.
+        cumsum : numpy array of int64
+            Prefix sums of amounts, one longer than dates.
+        '''
+        index = cls()
+        skip = np.searchsorted(dates, np.iinfo(np.int64).min, side='right')
+        index.dates, index.amounts = dates[skip:], amounts[skip:]
+        index.cumsum = cumsum[skip:] - cumsum[skip] if skip else cumsum
+        return index
+
+    def _build(self, dates, amounts):
+        order = np.argsort(dates, kind='stable')
+        self.dates = dates[order]
+        self.amounts = amounts[order]
+        self.cumsum = np.concatenate(([0], np.cumsum(self.amounts)))
+        self._tail_dates = []
+        self._tail_amounts = []
+
+    def __len__(self):
+        return len(self.dates) + len(self._tail_dates)
+
+    def add(self, date, amount) -> None:
+        '''
+        Adds one entry to the index.
+
+        Parameters
+        ----------
+        date : str or pd.Timestamp
+            Date of the entry.
+        amount : int
+            Amount of the entry in cents.
+        '''
+        self._tail_dates.append(to_ns(date))
+        self._tail_amounts.append(int(amount))
+        if len(self._tail_dates) > self._tail_limit():
+            self._merge()
+
+    def extend(self, dates, amounts) -> None:
+        '''
+        Adds a batch of entries. Only the batch is sorted; it is then
+        merged into the sorted arrays, or kept in the tail while small.
+
+        Parameters
+        ----------
+        dates : array-like of datetime64
+            Entry dates.
+        amounts : array-like of int
+            Entry amounts in cents.
+        '''
+        other = DateIndex(dates, amounts)
+        if len(self._tail_dates) + len(other.dates) <= self._tail_limit():
+            self._tail_dates.extend(other.dates.tolist())
+            self._tail_amounts.extend(other.amounts.tolist())
+            return
+        self._insert(np.concatenate((other.dates, np.asarray(self._tail_dates, dtype=np.int64))),
+                     np.concatenate((other.amounts, np.asarray(self._tail_amounts, dtype=np.int64))))
+
+    def _tail_limit(self):
+        return max(64, int(len(self.dates) ** 0.5))
+
+    def _merge(self):
+        self._insert(np.asarray(self._tail_dates, dtype=np.int64),
+                     np.asarray(self._tail_amounts, dtype=np.int64))
+
+    def _insert(self, dates, amounts):
+        # Linear merge of a (small) unsorted batch into the sorted arrays;
+        # equal dates keep insertion order.
+        order = np.argsort(dates, kind='stable')
+        dates, amounts = dates[order], amounts[order]
+        at = np.searchsorted(self.dates, dates, side='right')
+        self.dates = np.insert(self.dates, at, dates)
+        self.amounts = np.insert(self.amounts, at, amounts)
+        # Prefix sums before the first inserted entry are unchanged.
+        lo = int(at[0]) if len(at) else len(self.amounts)
+        self.cumsum = np.concatenate((self.cumsum[:lo + 1], self.cumsum[lo] + np.cumsum(self.amounts[lo:])))
+        self._tail_dates = []
+        self._tail_amounts = []
+
+    def min(self):
+        values = self.dates[:1].tolist() + self._tail_dates
+        return pd.Timestamp(min(values)) if values else None
+
+    def max(self):
+        values = self.dates[-1:].tolist() + self._tail_dates
+        return pd.Timestamp(max(values)) if values else None
+
+    def range_sum(self, start=None, end=None) -> int:
+        '''
+        Sums the amounts with start <= date <= end.
+
+        Parameters
+        ----------
+        start : str or pd.Timestamp, optional
+            Inclusive lower bound; open when None.
+        end : str or pd.Timestamp, optional
+            Inclusive upper bound; open when None.
+
+        Returns
+        -------
+        type: Int
+            Sum of the amounts within the range, in cents.
+        '''
+        lo = 0 if start is None else np.searchsorted(self.dates, to_ns(start), side='left')
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, to_ns(end), side='right')
+        total = int(self.cumsum[hi] - self.cumsum[lo]) if hi > lo else 0
+
+        if self._tail_dates:
+            lo_ns = -np.inf if start is None else to_ns(start)
+            hi_ns = np.inf if end is None else to_ns(end)
+            total += sum(a for d, a in zip(self._tail_dates, self._tail_amounts) if lo_ns <= d <= hi_ns)
+        return total
+
+
+class CategoryIndex():
+    '''
+    Per-category aggregates (sum, count, min, max, last date).
+
+    Built with a single groupby when the ledger is loaded and updated in O(1)
+    for every new entry.
+    '''
+    FIELDS = ['sum', 'count', 'min', 'max', 'last']
+
+    def __init__(self, data=None):
+        '''
+        Parameters
+        ----------
+        data : Pandas Dataframe, optional
+            Ledger with 'Ammount', 'Date' and 'Category' columns.
+        '''
+        self.stats = {}
+        if data is None or not len(data):
+            return
+        grouped = data.assign(Ammount=pd.to_numeric(data['Ammount'])).groupby(
+            'Category', observed=True, sort=False)
+        table = grouped['Ammount'].agg(['sum', 'count', 'min', 'max'])
+        table['last'] = grouped['Date'].max()
+        for cat, row in zip(table.index, table.itertuples(index=False)):
+            self.stats[cat] = list(row)
+
+    def add(self, cat, amount, date) -> None:
+        '''
+        Folds one entry into its category's aggregates.
+
+        Parameters
+        ----------
+        cat : str
+            Category of the entry.
+        amount : int
+            Amount of the entry in cents.
+        date : pd.Timestamp
+            Date of the entry.
+        '''
+        stats = self.stats.get(cat)
+        if stats is None:
+            self.stats[cat] = [amount, 1, amount, amount, date]
+            return
+        stats[0] += amount
+        stats[1] += 1
+        stats[2] = min(stats[2], amount)
+        stats[3] = max(stats[3], amount)
+        if pd.isna(stats[4]) or date > stats[4]:
+            stats[4] = date
+
+    def extend(self, data) -> None:
+        '''
+        Folds a batch of entries into the aggregates.
+
+        Parameters
+        ----------
+        data : Pandas Dataframe
+            Ledger chunk with 'Ammount', 'Date' and 'Category' columns.
+        '''
+        for cat, (total, count, low, high, last) in _category_stats(data):
+            stats = self.stats.get(cat)
+            if stats is None:
+                self.stats[cat] = [total, count, low, high, last]
+                continue
+            stats[0] += total
+            stats[1] += count
+            stats[2] = min(stats[2], low)
+            stats[3] = max(stats[3], high)
+            if pd.isna(stats[4]) or last > stats[4]:
+                stats[4] = last
+
+    def sum(self, cat):
+        stats = self.stats.get(cat)
+        return stats[0] if stats else 0
+
+    def table(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            One row per category with the sum, count, min, max and last columns.
+        '''
+        table = pd.DataFrame.from_dict(self.stats, orient='index', columns=self.FIELDS)
+        table.index.name = 'Category'
+        return table
+
+
+def _category_stats(data):
+    # Per-category aggregates of a batch with plain numpy: a groupby costs
+    # milliseconds even for a handful of rows.
+    codes, cats = pd.factorize(data['Category'])
+    amounts = pd.to_numeric(data['Ammount']).to_numpy()
+    # NaT is the smallest int64, so max() skips it unless every date is NaT.
+    dates = data['Date'].to_numpy(dtype='datetime64[ns]').view('i8')
+    for code, cat in enumerate(cats.tolist()):
+        mask = codes == code
+        values = amounts[mask]
+        yield cat, (values.sum(), len(values), values.min(), values.max(),
+                    pd.Timestamp(dates[mask].max(), unit='ns'))
+
+
+NS_PER_DAY = 86_400 * 10**9
+EPOCH_ORDINAL = 719_163  # date(1970, 1, 1).toordinal()
+
+def period_start(date, freq):
+    '''
+    Returns the start of the day, ISO week (Monday), month or year
+    containing date, as a day number (days since 1970-01-01).
+    '''
+    date = pd.Timestamp(date)
+    if freq == 'month':
+        return datetime.date(date.year, date.month, 1).toordinal() - EPOCH_ORDINAL
+    if freq == 'year':
+        return datetime.date(date.year, 1, 1).toordinal() - EPOCH_ORDINAL
+    day = date.as_unit('ns').value // NS_PER_DAY
+    if freq == 'week':
+        # 1970-01-01 was a Thursday, so Monday-based weeks are offset by 3 days.
+        return day - (day + 3) % 7
+    return day
+
+def period_starts(dates, freq):
+    '''
+    Vectorized period_start for an array of dates.
+    '''
+    return roll_days(np.asarray(pd.to_datetime(dates), dtype='datetime64[D]').view('i8'), freq)
+
+def roll_days(days, freq):
+    '''
+    Maps day numbers to the day number starting their week, month or year.
+    '''
+    days = np.asarray(days, dtype=np.int64)
+    if freq == 'week':
+        # 1970-01-01 was a Thursday, so Monday-based weeks are offset by 3 days.
+        return days - (days + 3) % 7
+    if freq in ('month', 'year'):
+        unit = 'datetime64[M]' if freq == 'month' else 'datetime64[Y]'
+        return days.view('datetime64[D]').astype(unit).astype('datetime64[D]').view('i8')
+    return days
+
+def day_to_date(days):
+    '''
+    Converts day numbers from period_start back to timestamps.
+    '''
+    return pd.to_datetime(np.asarray(days, dtype=np.int64), unit='D')
+
+
+class PeriodTotals():
+    '''
+    Running total and count of the ledger, plus rollup tables per day, ISO
+    week, month and year, overall and per category, all maintained
+    incrementally.
+
+    buckets[freq] maps a period start (day number) to [sum, count], and
+    category_buckets[freq][cat] does the same for one category, so a
+    report over years of data reads a few hundred buckets instead of the
+    raw entries.
+    '''
+    FREQS = ('day', 'week', 'month', 'year')
+
+    def __init__(self, data=None):
+        '''
+        Parameters
+        ----------
+        data : Pandas Dataframe, optional
+            Ledger with 'Ammount', 'Date' and 'Category' columns.
+        '''
+        self.total = 0
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.buckets = {freq: {} for freq in self.FREQS}
+        self.category_buckets = {freq: {} for freq in self.FREQS}
+        if data is None or not len(data):
+            return
+
+        amounts = pd.to_numeric(data['Ammount'])
+        self.total = amounts.sum()
+        self.count = len(data)
+        self.first = data['Date'].min()
+        self.last = data['Date'].max()
+        # Coarser buckets are rolled up from the (much smaller) daily ones.
+        # Undated entries count towards the total but belong to no period.
+        dated = data['Date'].notna().to_numpy()
+        amounts, categories = amounts[dated], data['Category'][dated]
+        days = period_starts(data['Date'][dated], 'day')
+        daily = amounts.groupby(days).agg(['sum', 'count'])
+        by_category = amounts.groupby([days, categories], observed=True).agg(['sum', 'count'])
+        cat_days = by_category.index.get_level_values(0)
+        cats = by_category.index.get_level_values(1)
+        for freq in self.FREQS:
+            totals = daily.groupby(roll_days(daily.index, freq)).sum()
+            self.buckets[freq] = {key: [amount, count] for key, amount, count in
+                                  zip(totals.index.tolist(), totals['sum'].tolist(), totals['count'].tolist())}
+            totals = by_category.groupby([cats, roll_days(cat_days, freq)]).sum()
+            buckets = self.category_buckets[freq]
+            for (cat, key), amount, count in zip(totals.index, totals['sum'].tolist(), totals['count'].tolist()):
+                buckets.setdefault(cat, {})[key] = [amount, count]
+
+    @classmethod
+    def from_frame(cls, frame, first=None, last=None):
+        '''
+        Rebuilds the rollups saved with to_frame().
+
+        Parameters
+        ----------
+        frame : Pandas Dataframe
+            Output of to_frame(), amounts in cents.
+        first, last : pd.Timestamp, optional
+            Earliest and latest entry dates of the ledger.
+
+        Returns
+        -------
+        type: PeriodTotals
+        '''
+        totals = cls()
+        keys = period_starts(frame['Date'], 'day').tolist()
+        for freq, key, cat, amount, count in zip(frame['Freq'], keys, frame['Category'],
+                                                 frame['Ammount'].tolist(), frame['Count'].tolist()):
+            if pd.isna(cat):
+                buckets = totals.buckets[freq]
+            else:
+                buckets = totals.category_buckets[freq].setdefault(cat, {})
+            buckets[key] = [int(amount), int(count)]
+        for amount, count in totals.buckets['year'].values():
+            totals.total += amount
+            totals.count += count
+        totals.first, totals.last = first, last
+        return totals
+
+    def to_frame(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            Every bucket as a row: Freq, Date (period start), Category
+            (missing for the all-categories rows), Ammount (cents) and Count.
+        '''
+        rows = []
+        for freq in self.FREQS:
+            rows.extend((freq, key, None, amount, count)
+                        for key, (amount, count) in self.buckets[freq].items())
+            for cat, buckets in self.category_buckets[freq].items():
+                rows.extend((freq, key, cat, amount, count)
+                            for key, (amount, count) in buckets.items())
+        frame = pd.DataFrame(rows, columns=['Freq', 'Date', 'Category', 'Ammount', 'Count'])
+        frame['Date'] = day_to_date(frame['Date'])
+        return frame
+
+    def series(self, freq, how='sum', categories=None):
+        '''
+        Returns one rollup as a Series.
+
+        Parameters
+        ----------
+        freq : str
+            'day', 'week', 'month' or 'year'.
+        how : str
+            'sum' (cents) or 'count'.
+        categories : iterable of str, optional
+            Only add up these categories; all entries when None.
+
+        Returns
+        -------
+        type: Pandas Series
+            Values indexed by period start, in chronological order.
+        '''
+        field = 0 if how == 'sum' else 1
+        if categories is None:
+            values = {key: bucket[field] for key, bucket in self.buckets[freq].items()}
+        else:
+            values = {}
+            for cat in categories:
+                for key, bucket in self.category_buckets[freq].get(cat, {}).items():
+                    values[key] = values.get(key, 0) + bucket[field]
+        series = pd.Series(list(values.values()), index=day_to_date(list(values.keys())), dtype=np.int64)
+        return series.sort_index()
+
+    def add(self, amount, date, cat=None) -> None:
+        '''
+        Folds one entry into the running totals.
+
+        Parameters
+        ----------
+        amount : int
+            Amount of the entry in cents.
+        date : pd.Timestamp
+            Date of the entry.
+        cat : str, optional
+            Category of the entry.
+        '''
+        # Every key is computed before anything changes, so a bad date
+        # raises with the totals untouched.
+        keys = [period_start(date, freq) for freq in self.FREQS]
+        self.total += amount
+        self.count += 1
+        if self.first is None or pd.isna(self.first) or date < self.first:
+            self.first = date
+        if self.last is None or pd.isna(self.last) or date > self.last:
+            self.last = date
+        for freq, key in zip(self.FREQS, keys):
+            _bump(self.buckets[freq], key, amount, 1)
+            if cat is not None:
+                _bump(self.category_buckets[freq].setdefault(cat, {}), key, amount, 1)
+
+    def extend(self, data) -> None:
+        '''
+        Folds a batch of entries into the running totals.
+
+        Parameters
+        ----------
+        data : Pandas Dataframe
+            Ledger chunk with 'Ammount', 'Date' and 'Category' columns.
+        '''
+        if not len(data):
+            return
+        amounts = pd.to_numeric(data['Ammount'])
+        first, last = data['Date'].min(), data['Date'].max()
+        self.total += amounts.sum()
+        self.count += len(data)
+        if self.first is None or pd.isna(self.first) or first < self.first:
+            self.first = first
+        if self.last is None or pd.isna(self.last) or last > self.last:
+            self.last = last
+        # Grouped with numpy rather than rebuilding a PeriodTotals: a
+        # pandas groupby per period costs milliseconds even for a few rows.
+        dated = data['Date'].notna().to_numpy()
+        amounts = amounts.to_numpy()[dated]
+        codes, cats = pd.factorize(data['Category'][dated])
+        masks = [(cat, codes == code) for code, cat in enumerate(cats.tolist())]
+        days = period_starts(data['Date'][dated], 'day')
+        for freq in self.FREQS:
+            keys = roll_days(days, freq)
+            for key, amount, count in _group(keys, amounts):
+                _bump(self.buckets[freq], key, amount, count)
+            for cat, mask in masks:
+                buckets = self.category_buckets[freq].setdefault(cat, {})
+                for key, amount, count in _group(keys[mask], amounts[mask]):
+                    _bump(buckets, key, amount, count)
+
+def _group(keys, amounts):
+    # (key, sum, count) for every distinct key.
+    order = np.argsort(keys, kind='stable')
+    keys, amounts = keys[order], amounts[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, len(keys)))
+    return zip(keys[starts].tolist(), np.add.reduceat(amounts, starts).tolist(), counts.tolist())
+
+def _bump(buckets, key, amount, count):
+    bucket = buckets.get(key)
+    if bucket is None:
+        buckets[key] = [amount, count]
+    else:
+        bucket[0] += amount
+        bucket[1] += count
@@ -0,0 +1,229 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+
+# Opt-in: off unless EXPENSES_PROFILE is set to anything but an empty or
+# false value ("0", "false", "no", "off"), "cprofile" to also profile, or
+# enable() is called. While off, an instrumented call costs one extra
+# function call and a flag check.
+_enabled = os.environ.get('EXPENSES_PROFILE', '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+_profiler = None
+
+# Latency histogram buckets: bucket i counts calls taking < 2**i microseconds.
+BUCKETS = 28
+
+class Stat():
+    '''
+    Counters for one instrumented name.
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, seconds, rows):
+        self.calls += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.histogram[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile call.
+        target = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return 2 ** i / 1e6
+        return self.max
+
+def enable(profile=False):
+    '''
+    Starts recording.
+
+    Parameters
+    ----------
+    profile : bool
+        Also run cProfile (on the calling thread) until disable().
+    '''
+    global _enabled, _profiler
+    _enabled = True
+    if profile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def disable():
+    global _enabled, _profiler
+    _enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    global _profiler
+    with _lock:
+        _stats.clear()
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler = cProfile.Profile()
+        if _enabled:
+            _profiler.enable()
+
+#-----------------------Recording--------------------------
+
+class measure():
+    '''
+    Context manager timing a block under a name, e.g.
+
+        with measure('Summary.refresh'):
+            ...
+
+    Rows reported with touched() inside the block are added to it (and to
+    any enclosing block).
+    '''
+    __slots__ = ('name', 'start', 'rows')
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+
+    def __enter__(self):
+        if _enabled:
+            stack = _stack()
+            stack.append(self)
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        start = getattr(self, 'start', None)
+        if start is None:
+            return False
+        elapsed = time.perf_counter() - start
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+            if stack:
+                stack[-1].rows += self.rows
+        with _lock:
+            stat = _stats.get(self.name)
+            if stat is None:
+                stat = _stats[self.name] = Stat()
+            stat.add(elapsed, self.rows)
+        return False
+
+def instrumented(name=None):
+    '''
+    Decorator timing every call of a function or method under name
+    (its qualified name by default, e.g. 'Manager.export').
+    '''
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with measure(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def touched(rows):
+    '''
+    Reports rows read or written by the innermost measured call.
+    '''
+    if _enabled:
+        stack = _stack()
+        if stack:
+            stack[-1].rows += int(rows)
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+#-----------------------Reports--------------------------
+
+def snapshot():
+    '''
+    Returns
+    -------
+    type: dict
+        name -> {'calls', 'seconds', 'mean', 'p50', 'p95', 'p99', 'max',
+        'rows', 'histogram'}; times in seconds.
+    '''
+    with _lock:
+        return {name: {
+            'calls': stat.calls,
+            'seconds': stat.seconds,
+            'mean': stat.seconds / stat.calls,
+            'p50': stat.percentile(0.50),
+            'p95': stat.percentile(0.95),
+            'p99': stat.percentile(0.99),
+            'max': stat.max,
+            'rows': stat.rows,
+            'histogram': list(stat.histogram),
+        } for name, stat in _stats.items()}
+
+def report(top=30):
+    '''
+    Returns
+    -------
+    type: str
+        One line per instrumented name, slowest total first, followed by
+        the cProfile summary when profiling.
+    '''
+    lines = [f"{'name':<32} {'calls':>8} {'total s':>9} {'mean ms':>9} {'p95 ms':>9} "
+             f"{'max ms':>9} {'rows':>12}"]
+    for name, s in sorted(snapshot().items(), key=lambda item: -item[1]['seconds']):
+        lines.append(f"{name:<32} {s['calls']:>8} {s['seconds']:>9.3f} {s['mean'] * 1e3:>9.3f} "
+                     f"{s['p95'] * 1e3:>9.3f} {s['max'] * 1e3:>9.3f} {s['rows']:>12,}")
+    if _profiler is not None:
+        out = io.StringIO()
+        # Reading the stats pauses the profiler; resume it afterwards.
+        pstats.Stats(_profiler, stream=out).sort_stats('cumulative').print_stats(top)
+        if _enabled:
+            _profiler.enable()
+        lines.append('')
+        lines.append(out.getvalue())
+    return '\n'.join(lines)
+
+def dump(path='expenses-profile'):
+    '''
+    Writes the report to <path>.txt and, when profiling, the raw cProfile
+    data to <path>.prof (open it with pstats or snakeviz).
+    '''
+    with open(path + '.txt', 'w') as f:
+        f.write(report())
+    if _profiler is not None:
+        _profiler.dump_stats(path + '.prof')
+        if _enabled:
+            _profiler.enable()
+    return path + '.txt'
+
+def dump_on_signal(path='expenses-profile', signum=None):
+    '''
+    Dumps the report whenever the process receives signum (SIGUSR1 by
+    default; POSIX only), so a running app can be inspected on demand.
+
+    Python only runs the handler once the interpreter regains control, so
+    a Qt app must wake it up periodically while its event loop is idle.
+    '''
+    import signal
+    signum = signum or getattr(signal, 'SIGUSR1', None)
+    if signum is not None:
+        signal.signal(signum, lambda *args: dump(path))
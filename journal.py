@@ -0,0 +1,133 @@
+import csv
+import os
+
+
+class Journal():
+    '''
+    Append-only write-ahead log of ledger entries.
+
+    Each entry is written as a single CSV record next to the main ledger
+    file, so saving a new expense costs one short append instead of a full
+    rewrite. Records are flushed on every append and fsynced in batches of
+    ``sync_every`` records.
+    '''
+
+    def __init__(self, path, columns, sync_every=16, check=None):
+        '''
+        Parameters
+        ----------
+        path : str
+            Journal file.
+        columns : list of str
+            Field names, in record order.
+        sync_every : int
+            Number of records written between fsyncs.
+        check : callable, optional
+            Called with each replayed record (a dict of strings); records
+            it rejects are skipped.
+        '''
+        self.path = path
+        self.columns = list(columns)
+        self.sync_every = max(1, int(sync_every))
+        self.check = check
+        self._file = None
+        self._unsynced = 0
+        self.count = sum(1 for _ in self.replay())
+
+    def replay(self):
+        '''
+        Yields every complete record stored in the journal.
+
+        A torn trailing record (e.g. after a crash mid-write) is skipped,
+        as are records with the wrong number of fields or rejected by
+        check.
+
+        Returns
+        -------
+        type: Generator of dict
+            One dict per record, keyed by column name.
+        '''
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline='') as f:
+            # Tracks whether the last line read by the csv reader, i.e. the
+            # end of the current record, was terminated.
+            terminated = [True]
+
+            def lines():
+                for line in f:
+                    terminated[0] = line.endswith('\n')
+                    yield line
+
+            for row in csv.reader(lines()):
+                if not terminated[0] or len(row) != len(self.columns):
+                    continue
+                record = dict(zip(self.columns, row))
+                if self.check is None or self.check(record):
+                    yield record
+
+    def append(self, rows) -> None:
+        '''
+        Appends records to the journal.
+
+        Parameters
+        ----------
+        rows : iterable of dict
+            Records keyed by column name.
+        '''
+        if self._file is None:
+            self._repair()
+            self._file = open(self.path, 'a', newline='')
+        writer = csv.writer(self._file)
+        for row in rows:
+            writer.writerow([row[c] for c in self.columns])
+            self.count += 1
+            self._unsynced += 1
+        self._file.flush()
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def _repair(self):
+        # A crash mid-write leaves an unterminated record at the end;
+        # appending after it would merge the next record into it. Rewrite
+        # the journal with the records replay() accepts first.
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b'\n':
+                return
+        records = list(self.replay())
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', newline='') as f:
+            csv.writer(f).writerows([record[c] for c in self.columns] for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.count = len(records)
+
+    def sync(self) -> None:
+        '''
+        Forces all appended records to disk.
+        '''
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def truncate(self) -> None:
+        '''
+        Empties the journal once its records are folded into the main file.
+        '''
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.count = 0
+
+    def close(self) -> None:
+        '''
+        Syncs and closes the journal file.
+        '''
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
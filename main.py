@@ -1,2 +1,35 @@
-from manager import Manager
-
+import os
+import sys
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+import instrument
+from home import Home
+
+# Only Qt and the dashboard are imported up front; the ledger (and pandas)
+# loads in the background once the dashboard is on screen.
+
+# While profiling, the event loop hands control back to Python this often so
+# the SIGUSR1 handler runs even when the app is idle.
+SIGNAL_POLL_MS = 250
+
+def main(argv=None):
+    app = QApplication(sys.argv if argv is None else argv)
+    app.setStyle("Fusion")
+
+    # EXPENSES_PROFILE=1 records call counts and latencies (=cprofile also
+    # profiles); the report is written on exit and on SIGUSR1.
+    if instrument.is_enabled():
+        instrument.enable(profile=os.environ.get('EXPENSES_PROFILE') == 'cprofile')
+        instrument.dump_on_signal()
+        app.aboutToQuit.connect(instrument.dump)
+        signal_poll = QTimer(app)
+        signal_poll.timeout.connect(lambda: None)
+        signal_poll.start(SIGNAL_POLL_MS)
+
+    home_window = Home()
+    home_window.show()
+
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
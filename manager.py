@@ -1,142 +1,1061 @@
-import pandas as pd
-
-class Manager():
-    def __init__(self):
-
-        try:
-            self.data = pd.read_csv('DATA.csv')
-            self.total = self.data['Ammount'].sum()
-        except:
-            self.data = pd.DataFrame(columns=['Ammount', 'Date', 'Category', 'Notes'])
-            self.data["Date"] = pd.to_datetime(self.data["Date"])
-            self.total = 0
-
-    #-------------------Getters------------------------------
-
-    def get_Dataframe(self):
-        '''
-        Returns
-        -------
-        type: Pandas Dataframe
-            Returns the DataFrame.
-        '''
-        return self.data
-    
-    def get_Amount_Category(self,cat:str) -> int:
-        '''
-        Returns the total amount for a given category.
-
-        Parameters
-        ----------
-        parameter1 : Category (cat)
-            name of the category
-
-        Returns
-        -------
-        type: Int
-            Sum of all the amount in that Category
-        '''
-        try:
-            return self.data[self.data['Category'] == cat]['Ammount'].sum()
-        except:
-            print("No such Category Found!")
-            return 0
-
-  
-    def get_Amount_Date(self, start=None, end=None):
-        '''
-        Returns the total amount for a given Date range.
-
-        Parameters
-        ----------
-        start : str or pd.Timestamp
-            Start date from which the amount will be summed.
-            Default is the least recent entry added (min date).
-        end : str or pd.Timestamp, optional
-            End date to which the amount will be summed.
-            Default is the most recent entry added (max date).
-
-        Returns
-        -------
-        type: Int
-            Sum of all the amount within the date range.
-        '''
-
-        
-        if start:
-            start_date = pd.to_datetime(start)
-        else:
-            start_date = self.data['Date'].min()
-
-        if end:
-            end_date = pd.to_datetime(end)
-        else:
-            end_date = self.data['Date'].max()
-
-        if start_date > end_date:
-            print("Invalid Date")
-            return 0  
-
-        filtered = self.data[(self.data['Date'] >= start_date) & (self.data['Date'] <= end_date)]
-        return filtered['Ammount'].sum()
-    
-    #-----------------------Filters--------------------------
-    
-    def sort_by_Date(self,ascnding=True):
-        '''
-        Sorts the data by date in ascending or deseding order.
-        Parameters
-        ----------
-        ascnding : bool 
-            True means ascending, False means desending
-        '''
-        self.data.sort_values(by='Date', inplace=True, ascending=ascnding)
-    
-    def sort_by_cat(self):
-        '''
-        Sorts the data by date in ascending by category.
-        Parameters
-        ----------
-        ascnding : bool 
-            True means ascending, False means desending
-            Default is True
-        '''
-        self.data.sort_values(by='Category', inplace=True, ascending=True)
-    
-    def sort_by_Amount(self,ascnding=True):
-        '''
-        Sorts the data by date in ascending by category.
-        Parameters
-        ----------
-        ascnding : bool 
-            True means ascending, False means desending
-            Default is True
-        '''
-        self.data.sort_values(by='Ammount', inplace=True, ascending=ascnding)
-
-    #-----------------------------Main functions------------------------
-
-    def add_entry(self,amount, date, cat, notes) -> None:
-        '''
-        Adds a new entry to the data.
-
-        Parameters
-        ----------
-        Amount : int 
-            Amount spent that will be added to dataframe
-        Date: str or pd.Timestamp
-            Date of the transcation
-        Cat: str
-            Category of the expense
-        notes: str
-            Any additional info or description for the transcation
-        '''
-        date = pd.to_datetime(date)
-        new = {'Ammount': amount, 'Date': date, 'Category': cat, 'Notes': notes}
-        self.data = pd.concat([self.data, pd.DataFrame([new])], ignore_index=True)
-    
-    def export(self):
-        '''
-        Exports the data to a csv file.
-        '''
-        self.data.to_csv('data.csv', index=False)
\ No newline at end of file
+import math
+import os
+import threading
+import numpy as np
+import pandas as pd
+from archive import archive_path, open_archive, write as write_archive
+from indexes import CategoryIndex, DateIndex, PeriodTotals, day_to_date, period_start
+from instrument import instrumented, touched
+from journal import Journal
+from parallel import Partitions
+from query import Query
+from search import NoteIndex
+from schema import (COLUMNS, concat, empty_frame, enforce, external, from_cents, parse_dates, to_cents,
+                    valid_record)
+from storage import open_sidecar, open_storage
+
+# add_entries indexes batches of at least this many rows with the extend()
+# methods, and shorter ones entry by entry.
+BATCH_ROWS = 256
+
+class Manager():
+    @instrumented()
+    def __init__(self, path='DATA.csv', journal=False, sync_every=16, compact_threshold=10000,
+                 compact_notes=False, progress=None, workers=0, lazy=False):
+        '''
+        Parameters
+        ----------
+        path : str
+            Main ledger file. The format follows the extension: '.csv',
+            '.parquet' or '.feather'; a path without an extension is a
+            directory with one file per month (see
+            storage.PartitionedStorage). A missing ledger in another format
+            is migrated from DATA.csv when that file exists.
+        journal : bool
+            When True, export() appends new entries to an append-only
+            journal ("<path>.journal") instead of rewriting the whole file.
+        sync_every : int
+            Number of journal records written between fsyncs.
+        compact_threshold : int
+            Journal size (in records) at which export() folds the journal
+            back into the main file. 0 disables automatic compaction.
+        compact_notes : bool
+            Store Notes as a categorical so repeated notes are kept once.
+        progress : callable, optional
+            Called with a short description of each loading stage, so a
+            window loading the ledger in the background can show it.
+        workers : int
+            When above 1, aggregations that need a scan (see query.Query)
+            run per month partition on a pool of this many processes.
+        lazy : bool
+            With a partitioned ledger, read the entries only once something
+            needs all of them. Until then get_Amount_Date, get_count,
+            get_Amount_Category and unsorted get_page are answered from the
+            manifest and the partitions they overlap. Ignored when the
+            ledger has an archive (see freeze) or unsaved journal records.
+
+        Entries moved to the read-only archive by freeze() are kept in
+        "<path>.archive" and memory-mapped on load instead of parsed.
+
+        In memory the ledger uses a compact schema (see schema.enforce):
+        amounts are int64 cents, dates datetime64[ns] and categories
+        categorical. Every public getter still works in dollars.
+        '''
+        self.path = path
+        self.storage = open_storage(path)
+        self.rollup_storage = open_sidecar(path, 'rollups')
+        self.compact_threshold = compact_threshold
+        self.compact_notes = compact_notes
+        self._unsaved = []
+        self._pending = []
+        self._frames = []
+        # lock guards the in-memory ledger; io_lock serializes file writes so
+        # export() can run on a background thread while entries are added.
+        self.lock = threading.RLock()
+        self.io_lock = threading.RLock()
+        self._sort_cache = {}
+        self.listeners = []
+        self.partitions = Partitions(workers) if workers > 1 else None
+        self.archive_path = archive_path(path)
+        self._recover()
+        self.journal = None
+        if journal:
+            self.journal = Journal(self.path + '.journal', COLUMNS, sync_every, check=valid_record)
+
+        self.archive = None
+        self.archived = 0
+        self._data = None
+        # Journal records are not in the partitions yet, so the ledger has
+        # to be read to answer anything.
+        if not (lazy and hasattr(self.storage, 'page') and self.storage.exists()
+                and not (self.journal and self.journal.count)
+                and not os.path.exists(self.archive_path)):
+            self._load(progress or (lambda stage: None))
+
+    def _load(self, progress=lambda stage: None):
+        with self.lock:
+            if self._data is not None:
+                return
+            progress("Reading ledger")
+            # Only a missing file is an empty ledger: any other read error
+            # is raised, since the next export() would overwrite the file.
+            if self.storage.exists():
+                data = enforce(self.storage.load(), self.compact_notes)
+            else:
+                data = enforce(empty_frame(), self.compact_notes)
+            # Archived entries come first; the main file holds the rest.
+            self.archive = open_archive(self.archive_path)
+            if self.archive is not None:
+                data = concat(self.archive.frame(self.compact_notes), data)
+                self.archived = len(self.archive)
+            self._data = data
+
+            if self.journal is not None:
+                progress("Replaying journal")
+                self._replay_journal()
+
+            progress("Building indexes")
+            self._build_indexes()
+        touched(len(self._data))
+
+    @property
+    def loaded(self):
+        '''
+        Whether the entries have been read (always, unless lazy=True).
+        '''
+        return self._data is not None
+
+    def __getattr__(self, name):
+        # The indexes of a lazy ledger are built on first use.
+        if name in ('date_index', 'category_index', 'period_totals', 'note_index') \
+                and self.__dict__.get('_data', ()) is None:
+            self._load()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def _build_indexes(self):
+        data = self.data
+        if self.archive is None:
+            self.date_index = DateIndex(data['Date'], data['Ammount'])
+        else:
+            # The archive is saved sorted by date with its prefix sums and
+            # note postings, so only the rows after it are indexed here.
+            live = data.iloc[self.archived:]
+            self.date_index = DateIndex.from_sorted(self.archive.dates, self.archive.cents,
+                                                    self.archive.cumsum)
+            self.date_index.extend(live['Date'], live['Ammount'])
+        self.category_index = CategoryIndex(data)
+        self.period_totals = self._load_rollups()
+        if self.archive is None:
+            self.note_index = NoteIndex(data['Notes'])
+        else:
+            self.note_index = NoteIndex.from_postings(*self.archive.postings())
+            self.note_index.extend(live['Notes'], self.archived)
+
+    def _load_rollups(self):
+        # The saved rollups are only trusted when the files they were saved
+        # with are unchanged and they still add up to the ledger; otherwise
+        # (first run, edited file, unsaved journal) they are rebuilt from
+        # the entries.
+        data = self.data
+        try:
+            frame = self.rollup_storage.load()
+            source = frame['Freq'] == 'ledger'
+            ledger = frame[source].iloc[0]
+            if ledger['Category'] != self._fingerprint():
+                return PeriodTotals(data)
+            frame = frame[~source]
+            totals = PeriodTotals.from_frame(frame.assign(Ammount=to_cents(frame['Ammount'])),
+                                             self.date_index.min(), self.date_index.max())
+            # Undated entries are in no bucket, so the totals are saved too.
+            totals.total, totals.count = to_cents(ledger['Ammount']), int(ledger['Count'])
+        except (OSError, ValueError, KeyError, IndexError):
+            return PeriodTotals(data)
+        if totals.count != len(data) or totals.total != int(data['Ammount'].sum()):
+            return PeriodTotals(data)
+        return totals
+
+    def _fingerprint(self):
+        # Size and modification time of every file the ledger is read from.
+        paths = [self.archive_path]
+        if self.journal is not None:
+            paths.append(self.journal.path)
+        parts = [self._main_fingerprint()]
+        for path in paths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+            else:
+                parts.append('-')
+        return '|'.join(parts)
+
+    def _main_fingerprint(self):
+        return self.storage.fingerprint() if self.storage.exists() else '-'
+
+    def _commit(self, save, fold_journal):
+        # compact() and freeze() replace the main file, then empty the
+        # journal (and freeze() swaps in the archive staged next to the
+        # old one). The marker written first holds the main file's
+        # fingerprint, so after a crash _recover() can tell whether the
+        # main file was replaced and finish or drop the rest, instead of
+        # replaying the journal on top of a file that already holds it.
+        with open(self.path + '.compacting', 'w') as f:
+            f.write(f"{self._main_fingerprint()}\n{int(fold_journal)}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            save()
+        except BaseException:
+            self._recover()
+            raise
+        if fold_journal and self.journal is not None:
+            self.journal.truncate()
+        self._finish_commit(fold_journal)
+
+    def _finish_commit(self, fold_journal):
+        staged = self.archive_path + '.new'
+        if os.path.exists(staged):
+            os.replace(staged, self.archive_path)
+        if fold_journal and os.path.exists(self.path + '.journal'):
+            os.remove(self.path + '.journal')
+        os.remove(self.path + '.compacting')
+
+    def _recover(self):
+        # Completes or rolls back a compact() or freeze() interrupted by a
+        # crash (see _commit).
+        marker = self.path + '.compacting'
+        if not os.path.exists(marker):
+            return
+        with open(marker) as f:
+            text = f.read()
+        fingerprint, fold_journal = (text.split('\n') + ['', ''])[:2]
+        if not text.endswith('\n') or fingerprint == self._main_fingerprint():
+            # The main file was never replaced (a torn marker was written
+            # before it was): the journal still holds entries it lacks.
+            staged = self.archive_path + '.new'
+            if os.path.exists(staged):
+                os.remove(staged)
+            os.remove(marker)
+        else:
+            self._finish_commit(fold_journal == '1')
+
+    @property
+    def total(self):
+        return from_cents(self.period_totals.total)
+
+    def _replay_journal(self):
+        rows = list(self.journal.replay())
+        if not rows:
+            return
+        replayed = enforce(pd.DataFrame(rows, columns=COLUMNS), self.compact_notes)
+        self.data = concat(self.data, replayed)
+
+    @property
+    def data(self):
+        # Entries are buffered in self._pending (and batches in
+        # self._frames) and only folded into the DataFrame, with a single
+        # copy, when it is actually read.
+        if self._data is None:
+            self._load()
+        if self._pending or self._frames:
+            with self.lock:
+                self._materialize()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def _materialize(self):
+        self._stage()
+        if not self._frames:
+            return
+        frames, self._frames = self._frames, []
+        self._data = concat(self._data, *frames)
+
+    def _stage(self, frame=None):
+        # Queues an enforced batch behind the entries added before it.
+        if self._pending:
+            self._frames.append(enforce(pd.DataFrame(self._pending, columns=COLUMNS), self.compact_notes))
+            self._pending = []
+        if frame is not None:
+            self._frames.append(frame)
+
+    #-------------------Getters------------------------------
+
+    def memory_report(self):
+        '''
+        Returns the in-memory size of the ledger.
+
+        Returns
+        -------
+        type: dict
+            Bytes per row for each column, plus 'total' bytes per row and
+            'rows'.
+        '''
+        data = self.data
+        usage = data.memory_usage(deep=True, index=False)
+        rows = max(len(data), 1)
+        report = (usage / rows).to_dict()
+        report['total'] = usage.sum() / rows
+        report['rows'] = len(data)
+        return report
+
+    @instrumented()
+    def get_Dataframe(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            Returns the DataFrame, with Ammount in dollars.
+        '''
+        return external(self.data)
+    
+    @instrumented()
+    def get_page(self, offset, limit, order=None):
+        '''
+        Returns a slice of the ledger.
+
+        Parameters
+        ----------
+        offset : int
+            Position of the first row.
+        limit : int
+            Maximum number of rows.
+        order : numpy array, optional
+            Row permutation from sort_order/sort_by_*; insertion order
+            when None.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            At most limit rows, with Ammount in dollars.
+        '''
+        if order is None and not self.loaded:
+            page = enforce(self.storage.page(offset, limit), self.compact_notes)
+            touched(len(page))
+            return external(page)
+        with self.lock:
+            if order is None:
+                page = self.data.iloc[offset:offset + limit]
+            else:
+                page = self.data.take(order[offset:offset + limit])
+        touched(len(page))
+        return external(page)
+
+    def get_count(self):
+        '''
+        Returns
+        -------
+        type: Int
+            Number of entries in the ledger.
+        '''
+        if not self.loaded:
+            return self.storage.count()
+        return self.period_totals.count
+
+    @instrumented()
+    def get_Amount_Category(self,cat:str) -> int:
+        '''
+        Returns the total amount for a given category.
+
+        Parameters
+        ----------
+        parameter1 : Category (cat)
+            name of the category
+
+        Returns
+        -------
+        type: Int
+            Sum of all the amount in that Category
+        '''
+        if not self.loaded:
+            return self.storage.category_total(cat)
+        return self.where(category=cat).sum()
+
+    @instrumented()
+    def get_category_totals(self):
+        '''
+        Returns the aggregates of every category in one call.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            Indexed by Category, with the sum, count, min and max of the
+            amounts and the last (most recent) date.
+        '''
+        with self.lock:
+            table = self.category_index.table()
+        for col in ('sum', 'min', 'max'):
+            table[col] = from_cents(table[col])
+        return table
+
+    @instrumented()
+    def get_stats(self):
+        '''
+        Returns the running ledger statistics in constant time.
+
+        Returns
+        -------
+        type: dict
+            total, count, first and last date, daily_average over the
+            first..last span, and the totals for the current day, week
+            and month ('today', 'this_week', 'this_month').
+        '''
+        now = pd.Timestamp.now()
+        with self.lock:
+            stats = self.period_totals
+            days = (stats.last - stats.first).days + 1 if stats.count else 0
+            return {
+                'total': from_cents(stats.total),
+                'count': stats.count,
+                'first': stats.first,
+                'last': stats.last,
+                'daily_average': from_cents(stats.total) / days if days else 0,
+                'today': self.get_period_total('day', now),
+                'this_week': self.get_period_total('week', now),
+                'this_month': self.get_period_total('month', now),
+            }
+
+    @instrumented()
+    def get_summary(self, weeks=4):
+        '''
+        Returns everything the Summary window shows, computed in one go.
+
+        All values come from the maintained aggregates, so the cost depends
+        on the number of categories and weeks, not on the number of entries.
+
+        Parameters
+        ----------
+        weeks : int
+            Number of weeks, ending with the week of the latest entry, in
+            the weekly series.
+
+        Returns
+        -------
+        type: dict
+            total, daily_average, top_category ((name, amount) or None),
+            categories (Series of totals, largest first) and weekly
+            (Series of totals indexed by week start, gaps filled with 0).
+        '''
+        with self.lock:
+            stats = self.get_stats()
+            categories = self.get_category_totals()['sum'].sort_values(ascending=False)
+            weekly = self.get_period_totals('week')
+
+        if stats['count']:
+            end = day_to_date([period_start(stats['last'], 'week')])[0]
+            weekly = weekly.reindex(pd.date_range(end=end, periods=weeks, freq='7D'), fill_value=0.0)
+        else:
+            weekly = weekly.iloc[:0]
+
+        return {
+            'total': stats['total'],
+            'daily_average': stats['daily_average'],
+            'top_category': (categories.index[0], categories.iloc[0]) if len(categories) else None,
+            'categories': categories,
+            'weekly': weekly,
+        }
+
+    def get_period_total(self, freq, date):
+        '''
+        Returns the total of the day, week, month or year containing a date.
+
+        Parameters
+        ----------
+        freq : str
+            'day', 'week' (ISO, Monday-based), 'month' or 'year'.
+        date : str or pd.Timestamp
+            Any date inside the wanted period.
+
+        Returns
+        -------
+        type: Float
+            Sum of the amounts in that period.
+        '''
+        return from_cents(self.period_totals.buckets[freq].get(period_start(date, freq), [0, 0])[0])
+
+    @instrumented()
+    def get_period_totals(self, freq):
+        '''
+        Returns every day, week, month or year bucket.
+
+        Parameters
+        ----------
+        freq : str
+            'day', 'week' (ISO, Monday-based), 'month' or 'year'.
+
+        Returns
+        -------
+        type: Pandas Series
+            Totals indexed by period start, in chronological order.
+        '''
+        return self.query().group_by(freq).sum()
+
+    @instrumented()
+    def get_rollup(self, freq, category=None):
+        '''
+        Returns a rollup table, read from the maintained buckets.
+
+        Parameters
+        ----------
+        freq : str
+            'day', 'week' (ISO, Monday-based), 'month' or 'year'.
+        category : str or list of str, optional
+            Only include these categories; every entry when None.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            'sum' and 'count' columns indexed by period start, in
+            chronological order.
+        '''
+        query = self.where(category=category).group_by(freq)
+        return pd.DataFrame({'sum': query.sum(), 'count': query.count()})
+
+  
+    @instrumented()
+    def get_Amount_Date(self, start=None, end=None):
+        '''
+        Returns the total amount for a given Date range.
+
+        Parameters
+        ----------
+        start : str or pd.Timestamp
+            Start date from which the amount will be summed.
+            Default is the least recent entry added (min date).
+        end : str or pd.Timestamp, optional
+            End date to which the amount will be summed.
+            Default is the most recent entry added (max date).
+
+        Returns
+        -------
+        type: Int
+            Sum of all the amount within the date range.
+        '''
+
+        if not self.loaded:
+            if start and end and pd.Timestamp(start) > pd.Timestamp(end):
+                print("Invalid Date")
+                return 0
+            return self.storage.total(start or None, end or None)
+
+        if start:
+            start_date = pd.Timestamp(start)
+        else:
+            start_date = self.date_index.min()
+
+        if end:
+            end_date = pd.Timestamp(end)
+        else:
+            end_date = self.date_index.max()
+
+        if start_date is None or end_date is None:
+            return 0
+
+        if start_date > end_date:
+            print("Invalid Date")
+            return 0  
+
+        return self.where(date_between=(start_date, end_date)).sum()
+    
+    @instrumented()
+    def search(self, query, category=None, start=None, end=None):
+        '''
+        Finds entries whose notes contain every word of the query.
+
+        Each word matches as a prefix, case-insensitively ("cof sho"
+        finds "Coffee shop"), using the notes index instead of scanning.
+
+        Parameters
+        ----------
+        query : str
+            Words to look for in the notes.
+        category : str, optional
+            Only keep entries of this category.
+        start : str or pd.Timestamp, optional
+            Only keep entries on or after this date.
+        end : str or pd.Timestamp, optional
+            Only keep entries on or before this date.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            Matching entries in insertion order, with Ammount in dollars.
+        '''
+        return self.where(notes=query, category=category, date_between=(start, end)).rows()
+
+    def query(self):
+        '''
+        Starts a lazy query over the ledger (see query.Query).
+
+        Returns
+        -------
+        type: Query
+        '''
+        return Query(self)
+
+    def where(self, **predicates):
+        '''
+        Shortcut for query().where(...), e.g.
+        where(category='Food', date_between=('2024-01-01', None)).group_by('month').sum()
+
+        Returns
+        -------
+        type: Query
+        '''
+        return self.query().where(**predicates)
+
+    #-----------------------Filters--------------------------
+    
+    def sort_by_Date(self,ascnding=True):
+        '''
+        Sorts the data by date in ascending or deseding order.
+        Parameters
+        ----------
+        ascnding : bool 
+            True means ascending, False means desending
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order (see sort_order).
+        '''
+        return self.sort_order('Date', ascnding)
+    
+    def sort_by_cat(self,ascnding=True):
+        '''
+        Sorts the data by date in ascending by category.
+        Parameters
+        ----------
+        ascnding : bool 
+            True means ascending, False means desending
+            Default is True
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order (see sort_order).
+        '''
+        return self.sort_order('Category', ascnding)
+    
+    def sort_by_Amount(self,ascnding=True):
+        '''
+        Sorts the data by date in ascending by category.
+        Parameters
+        ----------
+        ascnding : bool 
+            True means ascending, False means desending
+            Default is True
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order (see sort_order).
+        '''
+        return self.sort_order('Ammount', ascnding)
+
+    @instrumented()
+    def sort_order(self, column, ascending=True):
+        '''
+        Returns the permutation that sorts the ledger by a column.
+
+        The ledger itself is never reordered; apply the result with
+        get_page(..., order=) or data.take(). Only the ascending order is
+        stored per column: the first call sorts, later calls merge just the
+        rows added since, and descending is a reversed view of it.
+        Entries with equal keys keep insertion order (reversed when
+        descending).
+
+        Parameters
+        ----------
+        column : str
+            'Ammount', 'Date' or 'Category' (alphabetical).
+        ascending : bool
+            True means ascending, False means desending
+
+        Returns
+        -------
+        type: numpy array
+            Row positions of self.data in sorted order.
+        '''
+        with self.lock:
+            order = self._sort_cache.get(column)
+            rows = len(self.data)
+            if order is None:
+                order = np.argsort(self._sort_keys(column), kind='stable')
+                touched(rows)
+            elif len(order) < rows:
+                keys = self._sort_keys(column)
+                new = np.arange(len(order), rows)
+                touched(len(new))
+                new = new[np.argsort(keys[new], kind='stable')]
+                positions = np.searchsorted(keys[order], keys[new], side='right')
+                order = np.insert(order, positions, new)
+            self._sort_cache[column] = order
+        return order if ascending else order[::-1]
+
+    def _sort_keys(self, column):
+        values = self.data[column]
+        if column == 'Date':
+            return values.to_numpy(dtype='datetime64[ns]').view('i8')
+        if column == 'Category':
+            # Rank categories alphabetically; missing values sort last.
+            categories = values.cat.categories
+            rank = np.empty(len(categories) + 1, dtype=np.int64)
+            rank[np.argsort(categories.astype(str))] = np.arange(len(categories))
+            rank[-1] = len(categories)
+            return rank[values.cat.codes.to_numpy()]
+        return values.to_numpy()
+
+    #-----------------------------Main functions------------------------
+
+    @instrumented()
+    def add_entry(self,amount, date, cat, notes) -> None:
+        '''
+        Adds a new entry to the data.
+
+        Parameters
+        ----------
+        Amount : int 
+            Amount spent that will be added to dataframe
+        Date: str or pd.Timestamp
+            Date of the transcation
+        Cat: str
+            Category of the expense
+        notes: str
+            Any additional info or description for the transcation
+
+        Raises ValueError, without changing the ledger, when the amount is
+        not a finite number or the date is missing.
+        '''
+        date = pd.Timestamp(date)
+        _check_entry(amount, date)
+        new = {'Ammount': amount, 'Date': date, 'Category': cat, 'Notes': notes}
+        with self.lock:
+            # Indexed first: on a lazy ledger this reads the entries, which
+            # must not include the new one yet.
+            self._index_entry(to_cents(amount), date, cat, notes)
+            self._pending.append(new)
+            self._unsaved.append(new)
+        touched(1)
+        self._notify('entry_added', category=cat, date=date)
+
+    @instrumented()
+    def add_entries(self, entries) -> int:
+        '''
+        Adds many entries at once.
+
+        Parameters
+        ----------
+        entries : iterable
+            (amount, date, cat, notes) tuples or dicts with the
+            'Ammount', 'Date', 'Category' and 'Notes' keys.
+
+        Returns
+        -------
+        type: Int
+            Number of entries added.
+
+        Raises ValueError, adding nothing, when any amount is not a finite
+        number or any date is missing.
+        '''
+        rows = [dict(zip(COLUMNS, e)) if not isinstance(e, dict) else dict(e) for e in entries]
+        if not rows:
+            return 0
+        dates = pd.DatetimeIndex(parse_dates(pd.Series([row['Date'] for row in rows], dtype=object)))
+        amounts = [row['Ammount'] for row in rows]
+        # The whole batch is checked before any of it is indexed.
+        _check_entries(amounts, dates)
+        for row, date in zip(rows, dates):
+            row['Date'] = date
+        cents = to_cents(amounts)
+        touched(len(rows))
+        with self.lock:
+            # Indexing a batch at once has a fixed cost of a few
+            # milliseconds, so short batches are indexed row by row.
+            if len(rows) < BATCH_ROWS:
+                for row, amount in zip(rows, cents):
+                    self._index_entry(int(amount), row['Date'], row['Category'], row['Notes'])
+            else:
+                batch = pd.DataFrame({'Ammount': cents, 'Date': dates,
+                                      'Category': [row['Category'] for row in rows]})
+                self._index_batch(batch, [row['Notes'] for row in rows])
+            self._pending.extend(rows)
+            self._unsaved.extend(rows)
+        self._notify('range_changed', start=dates.min(), end=dates.max(),
+                     categories={row['Category'] for row in rows})
+        return len(rows)
+
+    def subscribe(self, listener) -> None:
+        '''
+        Registers a listener told about every change to the ledger.
+
+        Parameters
+        ----------
+        listener : callable
+            Called as listener(event, keys) after the change, on the
+            thread that made it:
+            'entry_added' with keys category and date (add_entry), or
+            'range_changed' with keys start, end and categories (a batch
+            from add_entries or import_csv).
+        '''
+        self.listeners.append(listener)
+
+    def _notify(self, event, **keys):
+        for listener in self.listeners:
+            listener(event, keys)
+
+    def _index_entry(self, cents, date, cat, notes):
+        # The new row's position is the number of rows before it.
+        # period_totals goes first: it is the only update that can fail
+        # (on a bad date) and it fails before changing anything.
+        row = self.period_totals.count
+        self.period_totals.add(cents, date, cat)
+        self.note_index.add(row, notes)
+        self.date_index.add(date, cents)
+        self.category_index.add(cat, cents, date)
+
+    def _index_batch(self, cents, notes):
+        # Batch counterpart of _index_entry, for an enforced chunk.
+        self.note_index.extend(notes, self.period_totals.count)
+        self.period_totals.extend(cents)
+        self.date_index.extend(cents['Date'], cents['Ammount'])
+        self.category_index.extend(cents)
+    
+    @instrumented()
+    def import_csv(self, path, chunksize=100_000, columns=None, date_format=None, sign=1) -> int:
+        '''
+        Streams a bank statement (or any CSV export) into the ledger.
+
+        The file is read chunksize rows at a time, so parsing never holds
+        more than one chunk of text. Each chunk is mapped to the ledger
+        columns, validated and indexed before the next one is read; in
+        journal mode it is also appended to the journal, so a crash keeps
+        the chunks imported so far. Otherwise the ledger file is written
+        once, after the last chunk.
+
+        Parameters
+        ----------
+        path : str
+            CSV file to import.
+        chunksize : int
+            Rows read per chunk.
+        columns : dict, optional
+            Maps source column names to 'Ammount', 'Date', 'Category' and
+            'Notes'. By default common bank export headers are recognised
+            (e.g. "Amount", "Transaction Date", "Description").
+        date_format : str, optional
+            strftime format of the date column; inferred when None.
+        sign : int
+            Multiplier applied to amounts. Use -1 for statements that list
+            spending as negative numbers.
+
+        Returns
+        -------
+        type: Int
+            Number of entries imported. Rows without a valid positive
+            amount or date are skipped.
+        '''
+        imported = skipped = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False):
+            chunk = _normalize_import(chunk, columns, date_format, sign)
+            valid = len(chunk.index)
+            chunk = chunk.dropna(subset=['Ammount', 'Date'])
+            chunk = chunk[chunk['Ammount'] > 0]
+            skipped += valid - len(chunk)
+            if not len(chunk):
+                continue
+
+            cents = enforce(chunk, self.compact_notes)
+            with self.lock:
+                # Chunks are concatenated once, when the ledger is next read.
+                self._index_batch(cents, chunk['Notes'])
+                self._stage(cents)
+            if self.journal is not None:
+                with self.io_lock:
+                    self.journal.append(chunk.to_dict('records'))
+            imported += len(chunk)
+            touched(len(chunk))
+            self._notify('range_changed', start=chunk['Date'].min(), end=chunk['Date'].max(),
+                         categories=set(chunk['Category']))
+
+        if imported:
+            if self.journal is None:
+                self.export()
+            else:
+                self._compact_if_due()
+        if skipped:
+            print(f"Skipped {skipped} invalid rows")
+        return imported
+
+    @instrumented()
+    def export(self):
+        '''
+        Exports the data to a csv file.
+
+        In journal mode only the entries added since the last export are
+        appended to the journal; the main file is rewritten once the journal
+        grows past compact_threshold records.
+
+        Safe to call from a background thread: entries added while the file
+        is being written are kept for the next export.
+        '''
+        with self.io_lock:
+            if self.journal is None:
+                self._write_main()
+                self._write_rollups()
+                return
+
+            with self.lock:
+                unsaved, self._unsaved = self._unsaved, []
+            self.journal.append(unsaved)
+            touched(len(unsaved))
+            self._compact_if_due()
+
+    def _compact_if_due(self):
+        with self.io_lock:
+            if self.compact_threshold and self.journal.count >= self.compact_threshold:
+                self.compact()
+
+    @instrumented()
+    def compact(self):
+        '''
+        Folds the journal back into the main file and empties it.
+        '''
+        with self.io_lock:
+            self._commit(self._write_main, self.journal is not None)
+            self._write_rollups()
+
+    @instrumented()
+    def freeze(self, before=None) -> int:
+        '''
+        Moves the entries dated before a cutoff to the read-only archive,
+        so later launches map them instead of parsing them, and rewrites
+        the main file with the rest.
+
+        Entries already archived stay archived; entries added later for an
+        archived period go to the main file like any other.
+
+        Parameters
+        ----------
+        before : str or pd.Timestamp, optional
+            Cutoff date. Default is the start of the current year.
+
+        Returns
+        -------
+        type: Int
+            Number of entries in the archive.
+        '''
+        if before:
+            before = pd.Timestamp(before)
+        else:
+            before = pd.Timestamp.now().normalize().replace(month=1, day=1)
+        with self.io_lock:
+            with self.lock:
+                data = self.data
+                old = (data['Date'] < before).to_numpy(copy=True)
+                old[:self.archived] = True
+                frozen, live = data[old], data[~old].reset_index(drop=True)
+
+                # Staged next to the current archive; _commit moves it
+                # into place once the main file holds only the rest.
+                write_archive(self.archive_path + '.new', frozen)
+                if self.archive is not None:
+                    self.archive.close()
+                self._commit(lambda: self.storage.save(external(live)), self.journal is not None)
+
+                self.archive = open_archive(self.archive_path)
+                self.archived = len(self.archive)
+                self._data = concat(self.archive.frame(self.compact_notes), live)
+                self._unsaved = []
+                # Row positions changed.
+                self._sort_cache.clear()
+                self._build_indexes()
+                if self.partitions is not None:
+                    self.partitions.reset()
+            self._write_rollups()
+            touched(len(data))
+        return self.archived
+
+    def close(self):
+        '''
+        Saves pending entries and releases the journal file.
+        '''
+        with self.io_lock:
+            if self.loaded:
+                self.export()
+            if self.journal is not None:
+                if self.loaded:
+                    self._write_rollups()
+                self.journal.close()
+            if self.partitions is not None:
+                self.partitions.close()
+
+    def _write_main(self):
+        # Snapshot under the lock, write outside it so add_entry never waits on disk.
+        with self.lock:
+            snapshot = external(self.data.iloc[self.archived:])
+            self._unsaved = []
+        self.storage.save(snapshot)
+        touched(len(snapshot))
+
+    def _write_rollups(self):
+        # Saved with a 'ledger' row holding the total, the count and the
+        # fingerprint of the files they describe (see _load_rollups).
+        with self.lock:
+            totals = self.period_totals
+            ledger = pd.DataFrame([('ledger', pd.NaT, self._fingerprint(), totals.total, totals.count)],
+                                  columns=['Freq', 'Date', 'Category', 'Ammount', 'Count'])
+            rollups = external(pd.concat([ledger, totals.to_frame()], ignore_index=True))
+        self.rollup_storage.save(rollups)
+
+
+def _check_entry(amount, date):
+    # Scalar version of _check_entries for add_entry, where building
+    # Series would cost more than the insert itself.
+    try:
+        finite = math.isfinite(float(amount))
+    except (TypeError, ValueError):
+        finite = False
+    if not finite:
+        raise ValueError("Invalid Amount")
+    if pd.isna(date):
+        raise ValueError("Invalid Date")
+
+def _check_entries(amounts, dates):
+    # Run before any index is touched, so a bad entry leaves the ledger as it was.
+    amounts = pd.to_numeric(pd.Series(amounts, dtype=object), errors='coerce')
+    if not np.isfinite(amounts.to_numpy(dtype=np.float64)).all():
+        raise ValueError("Invalid Amount")
+    if pd.isna(pd.Series(dates, dtype=object)).any():
+        raise ValueError("Invalid Date")
+
+IMPORT_ALIASES = {
+    'Ammount': ('ammount', 'amount', 'debit', 'debit amount', 'withdrawal', 'value'),
+    'Date': ('date', 'transaction date', 'posting date', 'posted date', 'booking date'),
+    'Category': ('category', 'type', 'transaction type'),
+    'Notes': ('notes', 'description', 'memo', 'details', 'payee', 'narrative'),
+}
+
+def _normalize_import(chunk, columns, date_format, sign):
+    # Maps a raw chunk (all strings) to the ledger columns in dollars.
+    if columns is None:
+        lookup = {name.strip().lower(): name for name in chunk.columns}
+        columns = {}
+        for target, aliases in IMPORT_ALIASES.items():
+            source = next((lookup[a] for a in aliases if a in lookup), None)
+            if source is not None:
+                columns[source] = target
+    chunk = chunk[list(columns)].rename(columns=columns)
+
+    if 'Ammount' not in chunk or 'Date' not in chunk:
+        raise ValueError("Could not find the amount and date columns; pass columns=")
+
+    amounts = chunk['Ammount'].str.replace(r'[^0-9.\-]', '', regex=True)
+    return pd.DataFrame({
+        'Ammount': pd.to_numeric(amounts, errors='coerce') * sign,
+        'Date': pd.to_datetime(chunk['Date'], format=date_format, errors='coerce'),
+        'Category': chunk['Category'].str.strip().replace('', 'Other') if 'Category' in chunk else 'Other',
+        'Notes': chunk['Notes'].str.strip() if 'Notes' in chunk else '',
+    }, index=chunk.index)
@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from indexes import NS_PER_DAY, roll_days, to_ns
+from schema import CENTS
+
+NAT = np.iinfo(np.int64).min
+COLUMNS = {'cents': np.int64, 'dates': np.int64, 'codes': np.int32}
+
+class Partitions():
+    '''
+    Date-partitioned copy of the ledger's numeric columns, aggregated on a
+    process pool.
+
+    The cents, dates and category codes are laid out in date order in
+    shared memory, so each month is a contiguous slice that a worker reads
+    without copying. A scan runs one task per month overlapping the
+    query's date range (the others are skipped) and the partial sums and
+    counts are merged. Entries added since the layout was built form a
+    small tail scanned in-process; the layout is rebuilt once the tail
+    grows past REBUILD_FRACTION of the ledger.
+    '''
+    REBUILD_FRACTION = 0.05
+
+    def __init__(self, workers, freq='month'):
+        '''
+        Parameters
+        ----------
+        workers : int
+            Number of worker processes.
+        freq : str
+            Partition size: 'month' or 'year'.
+        '''
+        self.workers = workers
+        self.freq = freq
+        self.pool = None
+        self.blocks = {}
+        self.rows = 0
+        self.parts = []
+        self.categories = None
+        self.lock = threading.Lock()
+
+    def aggregate(self, manager, predicates, group):
+        '''
+        Sums and counts the entries matching the predicates.
+
+        Parameters
+        ----------
+        manager : Manager
+            Ledger to aggregate.
+        predicates : dict
+            Query predicates (category, date_between, amount_gt, amount_lt).
+        group : str or None
+            None, 'category' or a period ('day', 'week', 'month', 'year').
+
+        Returns
+        -------
+        type: tuple
+            (sum, count) in cents when group is None; otherwise (keys, sums,
+            counts) arrays sorted by key, where keys are category codes
+            (positions in manager.data['Category'].cat.categories) or
+            period start day numbers.
+        '''
+        with self.lock:
+            with manager.lock:
+                data = manager.data
+                categories = data['Category'].cat.categories
+                if self._stale(len(data), categories):
+                    self._build(data, manager.sort_order('Date'))
+                tail = _columns(data.iloc[self.rows:])
+            spec = _spec(predicates, categories, group)
+
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            names = {col: block.name for col, block in self.blocks.items()}
+            start, end = spec['start'], spec['end']
+            futures = [self.pool.submit(_partial_shared, names, self.rows, lo, hi, spec)
+                       for lo, hi, first, last in self.parts
+                       if (start is None or last >= start) and (end is None or first <= end)]
+            partials = [_partial(*tail, spec)] + [future.result() for future in futures]
+
+        if group is None:
+            return sum(p[0] for p in partials), sum(p[1] for p in partials)
+        keys = np.concatenate([p[0] for p in partials])
+        merged = pd.DataFrame({'sum': np.concatenate([p[1] for p in partials]),
+                               'count': np.concatenate([p[2] for p in partials])}).groupby(keys).sum()
+        return merged.index.to_numpy(), merged['sum'].to_numpy(), merged['count'].to_numpy()
+
+    def _stale(self, rows, categories):
+        if not self.blocks or rows < self.rows:
+            return True
+        # Category codes stay valid while new categories are only appended.
+        if not categories[:len(self.categories)].equals(self.categories):
+            return True
+        return rows - self.rows > max(10_000, self.rows * self.REBUILD_FRACTION)
+
+    def _build(self, data, order):
+        self._release()
+        cents, dates, codes = _columns(data)
+        columns = {'cents': cents[order], 'dates': dates[order], 'codes': codes[order]}
+        for col, values in columns.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(len(values), dtype=COLUMNS[col], buffer=block.buf)[:] = values
+            self.blocks[col] = block
+        self.rows = len(data)
+        self.categories = data['Category'].cat.categories
+
+        # One partition per period; dates are sorted, so each is a slice.
+        dates = columns['dates']
+        keys = roll_days(dates // NS_PER_DAY, self.freq)
+        bounds = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1, [len(dates)]))
+        self.parts = [(int(lo), int(hi), int(dates[lo]), int(dates[hi - 1]))
+                      for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    def reset(self):
+        '''
+        Drops the layout, e.g. after the ledger's rows were reordered; the
+        next aggregate() rebuilds it.
+        '''
+        with self.lock:
+            self._release()
+
+    def _release(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def close(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+            self._release()
+
+
+def _columns(data):
+    return (data['Ammount'].to_numpy(dtype=np.int64),
+            data['Date'].to_numpy(dtype='datetime64[ns]').view('i8'),
+            data['Category'].cat.codes.to_numpy().astype(np.int32))
+
+def _spec(predicates, categories, group):
+    # Predicates in the workers' terms: category codes, ns bounds, cents.
+    spec = {'codes': None, 'start': None, 'end': None, 'gt': None, 'lt': None, 'group': group}
+    if 'category' in predicates:
+        wanted = categories.get_indexer(list(predicates['category']))
+        spec['codes'] = wanted[wanted >= 0].astype(np.int32)
+    if 'date_between' in predicates:
+        start, end = predicates['date_between']
+        spec['start'] = None if start is None else to_ns(start)
+        spec['end'] = None if end is None else to_ns(end)
+    if 'amount_gt' in predicates:
+        spec['gt'] = predicates['amount_gt'] * CENTS
+    if 'amount_lt' in predicates:
+        spec['lt'] = predicates['amount_lt'] * CENTS
+    return spec
+
+def _partial(cents, dates, codes, spec):
+    mask = np.ones(len(cents), dtype=bool)
+    if spec['codes'] is not None:
+        mask &= np.isin(codes, spec['codes'])
+    if spec['start'] is not None:
+        mask &= dates >= spec['start']
+    if spec['end'] is not None:
+        mask &= dates <= spec['end']
+    if spec['gt'] is not None:
+        mask &= cents > spec['gt']
+    if spec['lt'] is not None:
+        mask &= cents < spec['lt']
+
+    group = spec['group']
+    if group is None:
+        return int(cents[mask].sum()), int(mask.sum())
+    if group == 'category':
+        mask &= codes >= 0
+        keys = codes[mask]
+    else:
+        mask &= dates != NAT
+        keys = roll_days(dates[mask] // NS_PER_DAY, group)
+    keys, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=cents[mask], minlength=len(keys)).astype(np.int64)
+    counts = np.bincount(inverse, minlength=len(keys))
+    return keys, sums, counts
+
+_attached = {}
+
+def _partial_shared(names, rows, lo, hi, spec):
+    # Runs in a worker: maps the shared columns (once per process) and
+    # aggregates rows lo:hi.
+    for name in [name for name in _attached if name not in names.values()]:
+        # Blocks of a previous layout; release them.
+        block, view = _attached.pop(name)
+        del view
+        block.close()
+    columns = []
+    for col, name in names.items():
+        if name not in _attached:
+            # Spawned workers share the parent's resource tracker, which
+            # unlinks the block once the parent releases it.
+            block = shared_memory.SharedMemory(name=name)
+            _attached[name] = (block, np.ndarray(rows, dtype=COLUMNS[col], buffer=block.buf))
+        columns.append(_attached[name][1][lo:hi])
+    return _partial(*columns, spec)
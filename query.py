@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+from indexes import NS_PER_DAY, day_to_date, roll_days, to_ns
+from instrument import touched
+from schema import CENTS, external, from_cents
+
+PERIODS = ('day', 'week', 'month', 'year')
+NAT = np.iinfo(np.int64).min
+
+
+class Query():
+    '''
+    Lazy query over a Manager's ledger.
+
+    where() and group_by() only record what is asked for and return a new
+    Query; nothing is read until sum(), count() or rows() runs it. All
+    predicates are then evaluated together in one pass over the raw column
+    arrays, without building intermediate DataFrames, and questions the
+    Manager's indexes already answer skip the scan altogether.
+
+    Example: manager.where(category='Food', amount_gt=10).group_by('month').sum()
+    '''
+
+    def __init__(self, manager, predicates=None, group=None):
+        '''
+        Parameters
+        ----------
+        manager : Manager
+            Ledger to query.
+        predicates : dict, optional
+            Filters recorded by where().
+        group : str, optional
+            Grouping key recorded by group_by().
+        '''
+        self.manager = manager
+        self.predicates = dict(predicates or {})
+        self.group = group
+
+    def where(self, category=None, date_between=None, amount_gt=None, amount_lt=None, notes=None):
+        '''
+        Narrows the query. Calling where() again adds to the filters
+        already set (all of them must hold).
+
+        Parameters
+        ----------
+        category : str or list of str, optional
+            Keep entries of this category (or any of these categories).
+        date_between : tuple, optional
+            (start, end) dates, both inclusive; either may be None.
+        amount_gt : float, optional
+            Keep entries above this amount (in dollars).
+        amount_lt : float, optional
+            Keep entries below this amount (in dollars).
+        notes : str, optional
+            Keep entries whose notes contain every word (prefix match).
+
+        Returns
+        -------
+        type: Query
+        '''
+        predicates = dict(self.predicates)
+        if category is not None:
+            wanted = {category} if isinstance(category, str) else set(category)
+            if 'category' in predicates:
+                wanted &= predicates['category']
+            predicates['category'] = wanted
+        if date_between is not None:
+            start, end = (pd.Timestamp(d) if d else None for d in date_between)
+            if 'date_between' in predicates:
+                old_start, old_end = predicates['date_between']
+                start = old_start if start is None else start if old_start is None else max(start, old_start)
+                end = old_end if end is None else end if old_end is None else min(end, old_end)
+            if start is not None or end is not None:
+                predicates['date_between'] = (start, end)
+        if amount_gt is not None:
+            predicates['amount_gt'] = max(amount_gt, predicates.get('amount_gt', amount_gt))
+        if amount_lt is not None:
+            predicates['amount_lt'] = min(amount_lt, predicates.get('amount_lt', amount_lt))
+        if notes is not None:
+            predicates['notes'] = f"{predicates.get('notes', '')} {notes}".strip()
+        return Query(self.manager, predicates, self.group)
+
+    def group_by(self, key):
+        '''
+        Groups the results by period or by category.
+
+        Parameters
+        ----------
+        key : str
+            'day', 'week' (ISO, Monday-based), 'month', 'year' or 'category'.
+
+        Returns
+        -------
+        type: Query
+        '''
+        if key not in PERIODS and key != 'category':
+            raise ValueError(f"Cannot group by {key!r}; use one of {PERIODS + ('category',)}")
+        return Query(self.manager, self.predicates, key)
+
+    #-----------------------Results--------------------------
+
+    def sum(self):
+        '''
+        Returns
+        -------
+        type: Float or Pandas Series
+            Total amount in dollars; a Series of totals indexed by period
+            start (chronological) or category when grouped.
+        '''
+        with self.manager.lock:
+            result = self._from_indexes('sum')
+            if result is None:
+                result = self._aggregate('sum')
+        return from_cents(result)
+
+    def count(self):
+        '''
+        Returns
+        -------
+        type: Int or Pandas Series
+            Number of matching entries; a Series of counts when grouped.
+        '''
+        with self.manager.lock:
+            result = self._from_indexes('count')
+            if result is None:
+                result = self._aggregate('count')
+        return result
+
+    def rows(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            Matching entries in insertion order, with Ammount in dollars.
+            Grouping is ignored.
+        '''
+        with self.manager.lock:
+            data = self.manager.data
+            if not self.predicates:
+                return external(data)
+            positions, _, _, _ = self._scan()
+            return external(data.take(positions))
+
+    #-----------------------Execution--------------------------
+
+    def _from_indexes(self, how):
+        # Answers from the maintained aggregates when they cover the query.
+        # Returns None when a scan is needed.
+        manager = self.manager
+        predicates = self.predicates
+        if not predicates:
+            if self.group is None:
+                return manager.period_totals.total if how == 'sum' else manager.period_totals.count
+            if self.group == 'category':
+                table = manager.category_index.table()
+                return table[how].rename(None).astype(np.int64)
+            return manager.period_totals.series(self.group, how)
+
+        if set(predicates) == {'category'} and self.group in PERIODS:
+            return manager.period_totals.series(self.group, how, predicates['category'])
+        if self.group is not None:
+            return None
+        if set(predicates) == {'category'}:
+            stats = [manager.category_index.stats.get(cat) for cat in predicates['category']]
+            field = 0 if how == 'sum' else 1
+            return sum(s[field] for s in stats if s)
+        if set(predicates) == {'date_between'} and how == 'sum':
+            return manager.date_index.range_sum(*predicates['date_between'])
+        return None
+
+    def _scan(self):
+        # One fused pass: every predicate narrows a single boolean mask over
+        # the column arrays (views, not copies, unless the notes index has
+        # already picked a subset of rows).
+        data = self.manager.data
+        predicates = self.predicates
+        cents = data['Ammount'].to_numpy()
+        dates = data['Date'].to_numpy(dtype='datetime64[ns]').view('i8')
+        codes = data['Category'].cat.codes.to_numpy()
+        rows = None
+        if 'notes' in predicates:
+            rows = self.manager.note_index.lookup(predicates['notes'])
+            cents, dates, codes = cents[rows], dates[rows], codes[rows]
+
+        mask = np.ones(len(cents), dtype=bool)
+        if 'category' in predicates:
+            wanted = data['Category'].cat.categories.get_indexer(list(predicates['category']))
+            mask &= np.isin(codes, wanted[wanted >= 0])
+        if 'date_between' in predicates:
+            start, end = predicates['date_between']
+            if start is not None:
+                mask &= dates >= to_ns(start)
+            if end is not None:
+                mask &= dates <= to_ns(end)
+        if 'amount_gt' in predicates:
+            mask &= cents > predicates['amount_gt'] * CENTS
+        if 'amount_lt' in predicates:
+            mask &= cents < predicates['amount_lt'] * CENTS
+
+        touched(len(mask))
+        positions = np.flatnonzero(mask) if rows is None else rows[mask]
+        return positions, cents[mask], dates[mask], codes[mask]
+
+    def _aggregate(self, how):
+        partitions = self.manager.partitions
+        if partitions is not None and 'notes' not in self.predicates:
+            return self._aggregate_partitioned(partitions, how)
+
+        _, cents, dates, codes = self._scan()
+        if self.group is None:
+            return int(cents.sum()) if how == 'sum' else len(cents)
+
+        if self.group == 'category':
+            valid = codes >= 0
+            categories = self.manager.data['Category'].cat.categories
+            counts = np.bincount(codes[valid], minlength=len(categories))
+            if how == 'sum':
+                totals = pd.Series(cents[valid]).groupby(codes[valid]).sum()
+                values = totals.reindex(range(len(categories)), fill_value=0).to_numpy()
+            else:
+                values = counts
+            return pd.Series(values[counts > 0], index=categories[counts > 0].rename('Category'),
+                             dtype=np.int64)
+
+        valid = dates != NAT
+        keys = roll_days(dates[valid] // NS_PER_DAY, self.group)
+        grouped = pd.Series(cents[valid]).groupby(keys)
+        totals = grouped.sum() if how == 'sum' else grouped.size()
+        return pd.Series(totals.to_numpy(), index=day_to_date(totals.index), dtype=np.int64)
+
+    def _aggregate_partitioned(self, partitions, how):
+        # Same results as the in-process scan, computed per date partition
+        # on the manager's process pool.
+        result = partitions.aggregate(self.manager, self.predicates, self.group)
+        if self.group is None:
+            return result[0] if how == 'sum' else result[1]
+        keys, sums, counts = result
+        values = sums if how == 'sum' else counts
+        if self.group == 'category':
+            categories = self.manager.data['Category'].cat.categories
+            index = categories[keys].rename('Category')
+        else:
+            index = day_to_date(keys)
+        return pd.Series(values, index=index, dtype=np.int64)
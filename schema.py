@@ -0,0 +1,125 @@
+import math
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Ammount', 'Date', 'Category', 'Notes']
+
+# In memory, amounts are kept as fixed-point integer cents.
+CENTS = 100
+
+def to_cents(amount):
+    '''
+    Converts a dollar amount (scalar or array-like) to integer cents.
+    '''
+    if np.ndim(amount) == 0:
+        return int(round(float(amount) * CENTS))
+    return np.round(np.asarray(pd.to_numeric(amount), dtype=np.float64) * CENTS).astype(np.int64)
+
+def from_cents(cents):
+    '''
+    Converts integer cents (scalar or array-like) back to dollars.
+    '''
+    return cents / CENTS
+
+def parse_dates(dates):
+    '''
+    Parses a column of dates that may mix formats, e.g. '2024-01-05' and
+    '2024-02-01 10:00:00' for entries saved with and without a time.
+    ISO 8601 is tried first; other formats are inferred per value.
+
+    Returns
+    -------
+    type: Pandas Series or DatetimeIndex
+        datetime64 values, NaT where a date is missing.
+    '''
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return pd.to_datetime(dates)
+    try:
+        return pd.to_datetime(dates, format='ISO8601')
+    except ValueError:
+        return pd.to_datetime(dates, format='mixed')
+
+def valid_record(record):
+    '''
+    Whether a ledger record read back as strings (a journal line) has a
+    finite amount and a date; one merged with a torn line fails here.
+    '''
+    try:
+        amount = float(record['Ammount'])
+        date = pd.Timestamp(record['Date'])
+    except (TypeError, ValueError):
+        return False
+    return math.isfinite(amount) and not pd.isna(date)
+
+def empty_frame():
+    '''
+    Returns
+    -------
+    type: Pandas Dataframe
+        An empty ledger with the expected columns and dtypes.
+    '''
+    data = pd.DataFrame(columns=COLUMNS)
+    data["Date"] = pd.to_datetime(data["Date"])
+    return data
+
+def enforce(data, compact_notes=False):
+    '''
+    Casts a ledger in dollars to the compact in-memory schema.
+
+    Parameters
+    ----------
+    data : Pandas Dataframe
+        Ledger with the COLUMNS columns and amounts in dollars.
+    compact_notes : bool
+        Store Notes as a categorical too, so repeated notes are kept once.
+
+    Returns
+    -------
+    type: Pandas Dataframe
+        Ammount as int64 cents, Date as datetime64[ns], Category as a
+        categorical and Notes as strings (or a categorical).
+    '''
+    data = data.reset_index(drop=True)
+    notes = data['Notes'].astype('category' if compact_notes else 'string')
+    return pd.DataFrame({
+        'Ammount': to_cents(data['Ammount']),
+        'Date': parse_dates(data['Date']).astype('datetime64[ns]'),
+        'Category': data['Category'].astype('category'),
+        'Notes': notes,
+    }, index=pd.RangeIndex(len(data)))
+
+def external(data):
+    '''
+    Converts an in-memory ledger back to amounts in dollars.
+
+    Parameters
+    ----------
+    data : Pandas Dataframe
+        Ledger in the enforce() schema.
+
+    Returns
+    -------
+    type: Pandas Dataframe
+        The same ledger with a float Ammount column in dollars.
+    '''
+    return data.assign(Ammount=from_cents(data['Ammount']))
+
+def concat(data, *new):
+    '''
+    Appends enforced ledgers to another in one copy, keeping categorical
+    columns categorical by merging their categories first.
+    '''
+    frames = [frame for frame in new if len(frame)]
+    if len(data):
+        frames.insert(0, data)
+    elif len(frames) < 2:
+        return frames[0] if frames else new[-1]
+    frames = [frame.copy(deep=False) for frame in frames]
+    for col in ('Category', 'Notes'):
+        if all(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            categories = frames[0][col].cat.categories
+            for frame in frames[1:]:
+                categories = categories.union(frame[col].cat.categories, sort=False)
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
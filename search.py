@@ -0,0 +1,167 @@
+import bisect
+import re
+import numpy as np
+import pandas as pd
+
+TOKEN = re.compile(r'\w+')
+
+def tokenize(text):
+    '''
+    Splits text into lowercase word tokens.
+    '''
+    if not isinstance(text, str):
+        return []
+    return TOKEN.findall(text.lower())
+
+
+class NoteIndex():
+    '''
+    Inverted index over the Notes column.
+
+    Notes repeat a lot in an expense ledger, so each distinct note is
+    tokenized once: tokens map to distinct-note ids, and each note id maps
+    to the rows carrying that note. A sorted vocabulary answers prefix
+    queries with a binary search.
+    '''
+
+    def __init__(self, notes=None):
+        '''
+        Parameters
+        ----------
+        notes : array-like of str, optional
+            Notes of the existing rows, in row order.
+        '''
+        self.postings = {}
+        self.note_ids = {}
+        self.note_rows = []
+        self._vocab = []
+        self._vocab_dirty = False
+        if notes is not None:
+            self.extend(notes, 0)
+
+    @classmethod
+    def from_postings(cls, notes, rows, bounds, tokens, offsets, postings):
+        '''
+        Rebuilds an index saved by archive.write() without tokenizing.
+        The saved arrays are used as they are and only copied into lists
+        when a row or note is added to them.
+
+        Parameters
+        ----------
+        notes : list of str
+            Distinct notes, by note id.
+        rows : numpy array
+            Rows grouped by note id, ascending within a note.
+        bounds : numpy array
+            Note i is on rows[bounds[i]:bounds[i + 1]].
+        tokens : list of str
+            Sorted tokens.
+        offsets : numpy array
+            Token i is in postings[offsets[i]:offsets[i + 1]].
+        postings : numpy array
+            Note ids.
+        '''
+        index = cls()
+        index.note_ids = dict(zip(notes, range(len(notes))))
+        index.note_rows = np.split(rows, bounds[1:-1]) if len(notes) else []
+        index.postings = dict(zip(tokens, np.split(postings, offsets[1:-1]))) if tokens else {}
+        index._vocab = list(tokens)
+        return index
+
+    def _add_note(self, note):
+        note_id = len(self.note_rows)
+        self.note_ids[note] = note_id
+        self.note_rows.append([])
+        for token in set(tokenize(note)):
+            ids = self.postings.get(token)
+            if ids is None:
+                self.postings[token] = [note_id]
+                self._vocab_dirty = True
+            elif isinstance(ids, list):
+                ids.append(note_id)
+            else:
+                self.postings[token] = ids.tolist() + [note_id]
+        return note_id
+
+    def add(self, row, note) -> None:
+        '''
+        Indexes the note of one new row.
+
+        Parameters
+        ----------
+        row : int
+            Position of the row in the ledger.
+        note : str
+            Its note.
+        '''
+        if not isinstance(note, str) or not note:
+            return
+        self._note_rows(note).append(row)
+
+    def _note_rows(self, note):
+        # Rows of a note, as a list that can be appended to.
+        note_id = self.note_ids.get(note)
+        if note_id is None:
+            note_id = self._add_note(note)
+        rows = self.note_rows[note_id]
+        if not isinstance(rows, list):
+            rows = self.note_rows[note_id] = rows.tolist()
+        return rows
+
+    def extend(self, notes, first_row) -> None:
+        '''
+        Indexes the notes of a batch of new rows.
+
+        Parameters
+        ----------
+        notes : array-like of str
+            Notes of the new rows, in row order.
+        first_row : int
+            Position of the first new row in the ledger.
+        '''
+        # Each distinct note of the batch is looked up once.
+        codes, uniques = pd.factorize(pd.Series(notes, dtype=object))
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        rows = order + first_row
+        for note_id, note in enumerate(uniques):
+            if isinstance(note, str) and note:
+                self._note_rows(note).extend(rows[bounds[note_id]:bounds[note_id + 1]].tolist())
+
+    def _prefixed(self, prefix):
+        if self._vocab_dirty:
+            self._vocab = sorted(self.postings)
+            self._vocab_dirty = False
+        i = bisect.bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+            yield self._vocab[i]
+            i += 1
+
+    def lookup(self, query):
+        '''
+        Finds the rows whose note contains every word of the query, each
+        word matching as a prefix ("cof sho" finds "Coffee shop").
+
+        Parameters
+        ----------
+        query : str
+            Words to look for.
+
+        Returns
+        -------
+        type: numpy array
+            Sorted row positions.
+        '''
+        matched = None
+        for term in tokenize(query):
+            ids = set()
+            for token in self._prefixed(term):
+                ids.update(self.postings[token])
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return np.empty(0, dtype=np.int64)
+        if matched is None:
+            return np.empty(0, dtype=np.int64)
+
+        rows = [np.asarray(self.note_rows[note_id], dtype=np.int64) for note_id in matched]
+        return np.sort(np.concatenate(rows))
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import math
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+from manager import Manager
+from schema import COLUMNS
+
+# Inserts queued by all connections are applied together, at most
+# MAX_BATCH entries (and one journal write) at a time.
+MAX_BATCH = 5000
+MAX_BODY = 16 * 1024 * 1024
+# Changes kept for GET /events, and the longest a poll waits for one.
+MAX_EVENTS = 1000
+MAX_WAIT = 60
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+          413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class LedgerServer():
+    '''
+    Serves one Manager over a small local HTTP/JSON API, so several
+    front-ends can share a ledger.
+
+    Every insert goes through a single writer task: entries posted by all
+    connections are queued, applied with one add_entries() call and saved
+    with one export() per batch, and each request is answered once its
+    batch is written. Reads run concurrently on a thread pool.
+
+    Endpoints (amounts in dollars, dates as ISO strings):
+        POST /entries              one entry or a list of entries
+        GET  /totals/range         ?start=&end=
+        GET  /totals/categories
+        GET  /totals/period        ?freq=&date=
+        GET  /history              ?offset=&limit=&sort=&ascending=
+        GET  /stats
+        GET  /summary              ?weeks=
+        GET  /events               ?after=&timeout=
+
+    /events is a long poll for the Manager's change notifications (see
+    Manager.subscribe): it answers with the changes numbered after
+    'after' as soon as there is one, or empty after timeout seconds.
+    Without 'after' it answers at once with the latest number.
+    '''
+
+    def __init__(self, manager, host='127.0.0.1', port=8765, readers=4):
+        '''
+        Parameters
+        ----------
+        manager : Manager
+            Ledger to serve. It should only be written through the server.
+        host : str
+            Interface to listen on; local only by default.
+        port : int
+            Port to listen on; 0 picks a free one (see self.port).
+        readers : int
+            Threads answering read requests.
+        '''
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.read_pool = ThreadPoolExecutor(readers)
+        self.write_pool = ThreadPoolExecutor(1)
+        self.routes = {
+            ('POST', '/entries'): self.post_entries,
+            ('GET', '/totals/range'): self.get_range_total,
+            ('GET', '/totals/categories'): self.get_category_totals,
+            ('GET', '/totals/period'): self.get_period_total,
+            ('GET', '/history'): self.get_history,
+            ('GET', '/stats'): self.get_stats,
+            ('GET', '/summary'): self.get_summary,
+            ('GET', '/events'): self.get_events,
+        }
+        self.server = None
+        self.queue = None
+        self.writer_task = None
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.last_event = 0
+        self.changed = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+        self.manager.subscribe(self._on_change)
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self._write_loop())
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        '''
+        Stops accepting connections, writes the queued inserts and closes
+        the ledger.
+        '''
+        self.server.close()
+        # Answers the pending event polls.
+        self.changed.set()
+        await self.server.wait_closed()
+        await self.queue.join()
+        self.writer_task.cancel()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.write_pool, self.manager.close)
+        self.read_pool.shutdown()
+        self.write_pool.shutdown()
+
+    #-----------------------Connections--------------------------
+
+    async def _serve(self, reader, writer):
+        # One connection can carry many requests (HTTP/1.1 keep-alive).
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HttpError as e:
+                    await _respond(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self._dispatch(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            known = any(path == url.path for _, path in self.routes)
+            return (405, {'error': 'method not allowed'}) if known else (404, {'error': 'not found'})
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            return 200, await handler(params, body)
+        except HttpError as e:
+            return e.status, {'error': str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    async def _read(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_pool, function, *args)
+
+    #-----------------------Writer--------------------------
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            while size < MAX_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                size += len(batch[-1][0])
+            rows = [row for entries, _ in batch for row in entries]
+            try:
+                await loop.run_in_executor(self.write_pool, self._write, rows)
+                for entries, done in batch:
+                    done.set_result(len(entries))
+            except Exception as e:
+                for _, done in batch:
+                    done.set_exception(e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write(self, rows):
+        self.manager.add_entries(rows)
+        self.manager.export()
+
+    #-----------------------Events--------------------------
+
+    def _on_change(self, event, keys):
+        # Called by the Manager on the writer thread.
+        keys = {key: sorted(map(str, value)) if isinstance(value, set) else _jsonable(value)
+                for key, value in keys.items()}
+        self.loop.call_soon_threadsafe(self._publish, event, keys)
+
+    def _publish(self, event, keys):
+        self.last_event += 1
+        self.events.append({'id': self.last_event, 'event': event, 'keys': keys})
+        # Wakes every waiting poll; later polls wait on a fresh Event.
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    #-----------------------Handlers--------------------------
+
+    async def post_entries(self, params, body):
+        entries = json.loads(body or b'null')
+        if isinstance(entries, dict):
+            entries = [entries]
+        if not isinstance(entries, list) or not entries:
+            raise HttpError(400, 'expected an entry or a list of entries')
+        rows = [_parse_entry(entry) for entry in entries]
+        done = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, done))
+        return {'added': await done}
+
+    async def get_range_total(self, params, body):
+        total = await self._read(self.manager.get_Amount_Date, params.get('start'), params.get('end'))
+        return {'start': params.get('start'), 'end': params.get('end'), 'total': float(total)}
+
+    async def get_category_totals(self, params, body):
+        table = await self._read(self.manager.get_category_totals)
+        return {str(cat): {'sum': float(row['sum']), 'count': int(row['count']),
+                           'min': float(row['min']), 'max': float(row['max']),
+                           'last': _jsonable(row['last'])}
+                for cat, row in table.iterrows()}
+
+    async def get_period_total(self, params, body):
+        freq = params.get('freq', 'day')
+        if freq not in ('day', 'week', 'month', 'year'):
+            raise HttpError(400, f"unknown period {freq!r}")
+        if not params.get('date'):
+            raise HttpError(400, 'date is required')
+        total = await self._read(self.manager.get_period_total, freq, pd.Timestamp(params['date']))
+        return {'freq': freq, 'date': params['date'], 'total': float(total)}
+
+    async def get_history(self, params, body):
+        offset = int(params.get('offset', 0))
+        limit = min(int(params.get('limit', 100)), 10_000)
+        sort = params.get('sort')
+        ascending = params.get('ascending', 'true').lower() != 'false'
+        if sort is not None and sort not in ('Ammount', 'Date', 'Category'):
+            raise HttpError(400, f"cannot sort by {sort!r}")
+
+        def page():
+            order = None if sort is None else self.manager.sort_order(sort, ascending)
+            return self.manager.get_count(), self.manager.get_page(offset, limit, order)
+
+        count, rows = await self._read(page)
+        return {'count': count, 'offset': offset, 'entries': _records(rows)}
+
+    async def get_stats(self, params, body):
+        stats = await self._read(self.manager.get_stats)
+        return {key: _jsonable(value) for key, value in stats.items()}
+
+    async def get_summary(self, params, body):
+        weeks = int(params.get('weeks', 4))
+        if not 0 < weeks <= 520:
+            raise HttpError(400, 'weeks must be between 1 and 520')
+        summary = await self._read(self.manager.get_summary, weeks)
+        top = summary['top_category']
+        return {
+            'total': float(summary['total']),
+            'daily_average': float(summary['daily_average']),
+            'top_category': None if top is None else [str(top[0]), float(top[1])],
+            'categories': [[str(cat), float(total)] for cat, total in summary['categories'].items()],
+            'weekly': [[week.isoformat(), float(total)] for week, total in summary['weekly'].items()],
+        }
+
+    async def get_events(self, params, body):
+        if 'after' not in params:
+            return {'last': self.last_event, 'events': []}
+        after = int(params['after'])
+        timeout = min(float(params.get('timeout', 25)), MAX_WAIT)
+        if self.last_event <= after:
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return {'last': self.last_event, 'events': [e for e in self.events if e['id'] > after]}
+
+
+def _parse_entry(entry):
+    # Validated before queueing, so one bad entry fails its own request
+    # instead of the whole batch.
+    if isinstance(entry, list):
+        entry = dict(zip(COLUMNS, entry))
+    if not isinstance(entry, dict):
+        raise HttpError(400, 'an entry is an object or an [amount, date, category, notes] list')
+    amount = float(entry['Ammount'])
+    if not math.isfinite(amount) or not amount > 0:
+        raise HttpError(400, 'Ammount must be a positive number')
+    date = pd.Timestamp(entry['Date']) if entry.get('Date') is not None else pd.NaT
+    if pd.isna(date):
+        raise HttpError(400, 'Date is required')
+    return {'Ammount': amount, 'Date': date,
+            'Category': str(entry.get('Category') or 'Other'), 'Notes': entry.get('Notes') or ''}
+
+def _records(rows):
+    notes = rows['Notes'].astype(object).where(rows['Notes'].notna(), '')
+    return [{'Ammount': float(amount), 'Date': date.isoformat(), 'Category': str(cat), 'Notes': str(note)}
+            for amount, date, cat, note in zip(rows['Ammount'], rows['Date'], rows['Category'], notes)]
+
+def _jsonable(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if value is None or pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+async def _read_request(reader):
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, 'headers too large')
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise HttpError(400, 'malformed request line')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, 'invalid Content-Length')
+    if length < 0:
+        raise HttpError(400, 'invalid Content-Length')
+    if length > MAX_BODY:
+        raise HttpError(413, 'body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+async def _respond(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {STATUS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+def main(argv):
+    port = int(argv[0]) if argv else 8765
+    path = argv[1] if len(argv) > 1 else 'DATA.csv'
+    server = LedgerServer(Manager(path, journal=True), port=port)
+    print(f"Serving {path} on http://{server.host}:{port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        server.manager.close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,128 @@
+import os
+from PySide6.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, Signal
+
+class LedgerService(QObject):
+    '''
+    The one Manager shared by every window of the process.
+
+    The ledger is loaded once (in the background with load(), or on demand
+    with wait()) and every change to it is re-emitted as a Qt signal, so
+    windows refresh only what a change touched instead of re-reading the
+    ledger. Signals from changes made on other threads are delivered on
+    the GUI thread.
+
+    With a server address the windows share a ledger served by
+    server.LedgerServer: the service holds a client.LedgerClient instead
+    of a Manager, and the server's change events drive the same signals.
+    '''
+    progress = Signal(str)
+    loaded = Signal(object)
+    failed = Signal(str)
+    # category, date
+    entry_added = Signal(object, object)
+    # start, end, categories
+    range_changed = Signal(object, object, object)
+
+    def __init__(self, server=None, **options):
+        '''
+        Parameters
+        ----------
+        server : str, optional
+            'host:port' of a LedgerServer to use instead of opening the
+            ledger in this process.
+        **options
+            Keyword arguments for Manager, e.g. path='DATA.csv'. Ignored
+            with a server.
+        '''
+        super().__init__()
+        self.server = server
+        self.options = options
+        self.manager = None
+        self.loading = False
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+
+    def load(self):
+        '''
+        Starts loading the ledger on a background thread; loaded is
+        emitted once it is ready.
+        '''
+        if self.manager is None and not self.loading:
+            self.loading = True
+            self.pool.start(LoadTask(self))
+
+    def wait(self):
+        '''
+        Returns the Manager, loading it on this thread if needed.
+
+        Returns
+        -------
+        type: Manager or LedgerClient
+        '''
+        if self.manager is None:
+            self.pool.waitForDone()
+        if self.manager is None:
+            self._load()
+        return self.manager
+
+    def _load(self):
+        # Imported here so pandas is loaded off the GUI thread when load()
+        # is used.
+        self.progress.emit("Loading libraries")
+        if self.server:
+            from client import LedgerClient
+            host, _, port = self.server.rpartition(':')
+            self.progress.emit(f"Connecting to {self.server}")
+            manager = LedgerClient(host or '127.0.0.1', int(port))
+            manager.get_count()
+        else:
+            from manager import Manager
+            manager = Manager(progress=self.progress.emit, **self.options)
+        manager.subscribe(self._notify)
+        self.manager = manager
+        self.loading = False
+        self.loaded.emit(manager)
+
+    def _notify(self, event, keys):
+        if event == 'entry_added':
+            self.entry_added.emit(keys['category'], keys['date'])
+        else:
+            self.range_changed.emit(keys['start'], keys['end'], keys['categories'])
+
+    def close(self):
+        '''
+        Waits for a load in progress and closes the Manager.
+        '''
+        self.pool.waitForDone()
+        if self.manager is not None:
+            self.manager.close()
+
+class LoadTask(QRunnable):
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def run(self):
+        try:
+            self.service._load()
+        except Exception as e:
+            self.service.loading = False
+            self.service.failed.emit(str(e))
+
+_service = None
+
+def get_service():
+    '''
+    Returns the process-wide LedgerService, creating it on first use.
+    Create the QApplication first so the ledger is closed when it quits.
+
+    Set EXPENSES_SERVER to 'host:port' to point every window at a running
+    server (python server.py) instead of opening DATA.csv.
+    '''
+    global _service
+    if _service is None:
+        _service = LedgerService(server=os.environ.get('EXPENSES_SERVER'), journal=True)
+    return _service
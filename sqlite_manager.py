@@ -0,0 +1,405 @@
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from indexes import day_to_date, period_start
+from schema import COLUMNS
+from storage import CsvStorage
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    Ammount REAL NOT NULL,
+    Date TEXT NOT NULL,
+    Category TEXT NOT NULL,
+    Notes TEXT
+);
+'''
+
+# Covering indexes: range and category sums are answered from the index alone.
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (Date, Ammount);
+CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses (Category, Ammount);
+'''
+
+SORT_KEYS = {'Date': 'Date', 'Category': 'Category', 'Ammount': 'Ammount'}
+
+PERIODS = {'day': pd.Timedelta(days=1), 'week': pd.Timedelta(days=7),
+           'month': pd.DateOffset(months=1), 'year': pd.DateOffset(years=1)}
+
+class SQLiteManager():
+    '''
+    Drop-in alternative to Manager backed by a SQLite database.
+
+    Every entry is inserted in its own transaction, so nothing is ever
+    rewritten, and sums, date ranges and sorts run inside SQLite using the
+    Date and Category indexes instead of scanning a DataFrame.
+    '''
+
+    def __init__(self, path='DATA.db', migrate_from='DATA.csv'):
+        '''
+        Parameters
+        ----------
+        path : str
+            SQLite database file.
+        migrate_from : str
+            CSV ledger imported once when the database is created.
+        '''
+        self.path = path
+        new = not os.path.exists(path)
+        # AddExpense saves on a worker thread, so the connection is shared
+        # across threads; lock serializes every use of it.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.executescript(SCHEMA)
+        self._order = 'id ASC'
+        self._ids = None
+
+        # Bulk-load before indexing; building the indexes once is far cheaper
+        # than maintaining them row by row.
+        if new and migrate_from and os.path.exists(migrate_from):
+            self._insert_frame(CsvStorage(migrate_from).load())
+        self.conn.executescript(INDEXES)
+
+    @property
+    def total(self):
+        with self.lock:
+            return self.conn.execute('SELECT COALESCE(SUM(Ammount), 0) FROM expenses').fetchone()[0]
+
+    #-------------------Getters------------------------------
+
+    def get_Dataframe(self):
+        '''
+        Returns
+        -------
+        type: Pandas Dataframe
+            Returns the DataFrame in the current sort order.
+        '''
+        with self.lock:
+            return pd.read_sql_query(
+                f'SELECT Ammount, Date, Category, Notes FROM expenses ORDER BY {self._order}',
+                self.conn, parse_dates=['Date'])
+
+    def get_count(self):
+        '''
+        Returns
+        -------
+        type: Int
+            Number of entries in the ledger.
+        '''
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM expenses').fetchone()[0]
+
+    def get_page(self, offset, limit, order=None):
+        '''
+        Returns a slice of the ledger.
+
+        Parameters
+        ----------
+        offset : int
+            Position of the first row.
+        limit : int
+            Maximum number of rows.
+        order : numpy array, optional
+            Row permutation from sort_by_*; insertion order when None.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+            At most limit rows.
+        '''
+        columns = 'SELECT id, Ammount, Date, Category, Notes FROM expenses'
+        with self.lock:
+            if order is None:
+                page = pd.read_sql_query(f'{columns} ORDER BY id LIMIT ? OFFSET ?',
+                                         self.conn, params=(int(limit), int(offset)))
+            else:
+                ids = self._row_ids()[order[offset:offset + limit]].tolist()
+                marks = ', '.join('?' * len(ids))
+                page = pd.read_sql_query(f'{columns} WHERE id IN ({marks})', self.conn, params=ids)
+                page = page.set_index('id').loc[ids].reset_index()
+        page['Date'] = pd.to_datetime(page['Date'], format=DATE_FORMAT)
+        return page.drop(columns='id')
+
+    def get_stats(self):
+        '''
+        Returns the ledger statistics, like Manager.get_stats.
+
+        Returns
+        -------
+        type: dict
+            total, count, first and last date, daily_average over the
+            first..last span, and the totals for the current day, week
+            and month ('today', 'this_week', 'this_month').
+        '''
+        with self.lock:
+            total, count, first, last = self.conn.execute(
+                'SELECT COALESCE(SUM(Ammount), 0), COUNT(*), MIN(Date), MAX(Date) FROM expenses').fetchone()
+        first = pd.Timestamp(first) if first else None
+        last = pd.Timestamp(last) if last else None
+        days = (last - first).days + 1 if count else 0
+        now = pd.Timestamp.now()
+        return {
+            'total': total,
+            'count': count,
+            'first': first,
+            'last': last,
+            'daily_average': total / days if days else 0,
+            'today': self.get_period_total('day', now),
+            'this_week': self.get_period_total('week', now),
+            'this_month': self.get_period_total('month', now),
+        }
+
+    def get_summary(self, weeks=4):
+        '''
+        Returns everything the Summary window shows, like
+        Manager.get_summary.
+
+        Parameters
+        ----------
+        weeks : int
+            Number of weeks, ending with the week of the latest entry, in
+            the weekly series.
+
+        Returns
+        -------
+        type: dict
+            total, daily_average, top_category ((name, amount) or None),
+            categories (Series of totals, largest first) and weekly
+            (Series of totals indexed by week start, gaps filled with 0).
+        '''
+        stats = self.get_stats()
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT Category, SUM(Ammount) AS total FROM expenses '
+                'GROUP BY Category ORDER BY total DESC').fetchall()
+        categories = pd.Series([total for _, total in rows], index=[cat for cat, _ in rows], dtype=float)
+
+        if stats['count']:
+            end = day_to_date([period_start(stats['last'], 'week')])[0]
+            starts = pd.date_range(end=end, periods=weeks, freq='7D')
+            weekly = pd.Series([self.get_period_total('week', week) for week in starts], index=starts)
+        else:
+            weekly = pd.Series(dtype=float)
+
+        return {
+            'total': stats['total'],
+            'daily_average': stats['daily_average'],
+            'top_category': (categories.index[0], categories.iloc[0]) if len(categories) else None,
+            'categories': categories,
+            'weekly': weekly,
+        }
+
+    def get_period_total(self, freq, date):
+        '''
+        Returns the total of the day, week, month or year containing a date.
+
+        Parameters
+        ----------
+        freq : str
+            'day', 'week' (ISO, Monday-based), 'month' or 'year'.
+        date : str or pd.Timestamp
+            Any date inside the wanted period.
+
+        Returns
+        -------
+        type: Float
+            Sum of the amounts in that period.
+        '''
+        start = day_to_date([period_start(date, freq)])[0]
+        end = start + PERIODS[freq]
+        with self.lock:
+            return self.conn.execute(
+                'SELECT COALESCE(SUM(Ammount), 0) FROM expenses WHERE Date >= ? AND Date < ?',
+                (_format_date(start), _format_date(end))).fetchone()[0]
+
+    def get_Amount_Category(self, cat:str) -> int:
+        '''
+        Returns the total amount for a given category.
+
+        Parameters
+        ----------
+        cat : str
+            name of the category
+
+        Returns
+        -------
+        type: Int
+            Sum of all the amount in that Category
+        '''
+        with self.lock:
+            return self.conn.execute(
+                'SELECT COALESCE(SUM(Ammount), 0) FROM expenses WHERE Category = ?', (cat,)).fetchone()[0]
+
+    def get_Amount_Date(self, start=None, end=None):
+        '''
+        Returns the total amount for a given Date range.
+
+        Parameters
+        ----------
+        start : str or pd.Timestamp
+            Start date from which the amount will be summed.
+            Default is the least recent entry added (min date).
+        end : str or pd.Timestamp, optional
+            End date to which the amount will be summed.
+            Default is the most recent entry added (max date).
+
+        Returns
+        -------
+        type: Int
+            Sum of all the amount within the date range.
+        '''
+        clauses, params = [], []
+        if start:
+            clauses.append('Date >= ?')
+            params.append(_format_date(start))
+        if end:
+            clauses.append('Date <= ?')
+            params.append(_format_date(end))
+
+        if start and end and params[0] > params[1]:
+            print("Invalid Date")
+            return 0
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self.lock:
+            return self.conn.execute(
+                f'SELECT COALESCE(SUM(Ammount), 0) FROM expenses {where}', params).fetchone()[0]
+
+    #-----------------------Filters--------------------------
+
+    def sort_by_Date(self, ascnding=True):
+        '''
+        Sorts the data by date in ascending or deseding order.
+        Parameters
+        ----------
+        ascnding : bool
+            True means ascending, False means desending
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order, for get_page(..., order=).
+        '''
+        return self._set_order('Date', ascnding)
+
+    def sort_by_cat(self, ascnding=True):
+        '''
+        Sorts the data by category in ascending or deseding order.
+        Parameters
+        ----------
+        ascnding : bool
+            True means ascending, False means desending
+            Default is True
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order, for get_page(..., order=).
+        '''
+        return self._set_order('Category', ascnding)
+
+    def sort_by_Amount(self, ascnding=True):
+        '''
+        Sorts the data by amount in ascending or deseding order.
+        Parameters
+        ----------
+        ascnding : bool
+            True means ascending, False means desending
+
+        Returns
+        -------
+        type: numpy array
+            Row positions in sorted order, for get_page(..., order=).
+        '''
+        return self._set_order('Ammount', ascnding)
+
+    def _set_order(self, key, ascending):
+        # get_Dataframe() follows the last sort; the returned permutation
+        # lets History page through it like Manager's.
+        self._order = f"{SORT_KEYS[key]} {'ASC' if ascending else 'DESC'}, id ASC"
+        with self.lock:
+            ids = np.array([row[0] for row in self.conn.execute(
+                f'SELECT id FROM expenses ORDER BY {self._order}')], dtype=np.int64)
+            return np.searchsorted(self._row_ids(), ids)
+
+    def _row_ids(self):
+        # Row position -> id, refreshed when rows were added.
+        count = self.get_count()
+        if self._ids is None or len(self._ids) != count:
+            self._ids = np.array([row[0] for row in self.conn.execute(
+                'SELECT id FROM expenses ORDER BY id')], dtype=np.int64)
+        return self._ids
+
+    #-----------------------------Main functions------------------------
+
+    def add_entry(self, amount, date, cat, notes) -> None:
+        '''
+        Adds a new entry to the database in its own transaction.
+
+        Parameters
+        ----------
+        amount : int
+            Amount spent
+        date: str or pd.Timestamp
+            Date of the transcation
+        cat: str
+            Category of the expense
+        notes: str
+            Any additional info or description for the transcation
+        '''
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO expenses (Ammount, Date, Category, Notes) VALUES (?, ?, ?, ?)',
+                (float(amount), _format_date(date), cat, notes))
+
+    def add_entries(self, entries) -> int:
+        '''
+        Adds many entries in a single transaction.
+
+        Parameters
+        ----------
+        entries : iterable
+            (amount, date, cat, notes) tuples or dicts with the
+            'Ammount', 'Date', 'Category' and 'Notes' keys.
+
+        Returns
+        -------
+        type: Int
+            Number of entries added.
+        '''
+        rows = [e if isinstance(e, dict) else dict(zip(COLUMNS, e)) for e in entries]
+        return self._insert_frame(pd.DataFrame(rows, columns=COLUMNS))
+
+    def _insert_frame(self, data):
+        rows = zip(
+            pd.to_numeric(data['Ammount']).astype(float),
+            pd.to_datetime(data['Date']).dt.strftime(DATE_FORMAT),
+            data['Category'],
+            data['Notes'].astype(object).where(data['Notes'].notna(), None),
+        )
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO expenses (Ammount, Date, Category, Notes) VALUES (?, ?, ?, ?)', rows)
+        return len(data)
+
+    def export(self):
+        '''
+        Entries are committed as they are added; kept for Manager compatibility.
+        '''
+        with self.lock:
+            self.conn.commit()
+
+    def close(self):
+        '''
+        Closes the database connection.
+        '''
+        with self.lock:
+            self.conn.close()
+
+def _format_date(date):
+    # Fixed-width ISO text sorts chronologically, so the Date index serves range queries.
+    return pd.Timestamp(date).strftime(DATE_FORMAT)
@@ -0,0 +1,395 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from journal import Journal
+from schema import COLUMNS, from_cents, parse_dates, to_cents, valid_record
+
+class CsvStorage():
+    '''
+    Plain-text ledger file. Dates are parsed to datetime64 on load.
+    '''
+    suffix = '.csv'
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def fingerprint(self):
+        '''
+        Returns
+        -------
+        type: str
+            Size and modification time of the file, which change whenever
+            it is rewritten or edited.
+        '''
+        stat = os.stat(self.path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load(self):
+        data = pd.read_csv(self.path)
+        data['Date'] = parse_dates(data['Date'])
+        return data
+
+    def save(self, data):
+        # Write to a temporary file first so a crash never leaves a half-written ledger.
+        tmp = self.path + '.tmp'
+        self._write(data, tmp)
+        os.replace(tmp, self.path)
+
+    def _write(self, data, path):
+        data.to_csv(path, index=False)
+
+
+class ParquetStorage(CsvStorage):
+    '''
+    Typed columnar ledger file (requires pyarrow). Category is stored as a
+    dictionary-encoded categorical and Date as datetime64, so loading skips
+    text parsing entirely.
+    '''
+    suffix = '.parquet'
+
+    def load(self):
+        return pd.read_parquet(self.path)
+
+    def _write(self, data, path):
+        typed(data).to_parquet(path, index=False)
+
+
+class FeatherStorage(CsvStorage):
+    '''
+    Arrow IPC ledger file (requires pyarrow). Same typed layout as Parquet,
+    uncompressed and memory-mappable, trading disk space for load speed.
+    '''
+    suffix = '.feather'
+
+    def load(self):
+        return pd.read_feather(self.path)
+
+    def _write(self, data, path):
+        typed(data).reset_index(drop=True).to_feather(path)
+
+
+STORAGES = {s.suffix: s for s in (CsvStorage, ParquetStorage, FeatherStorage)}
+
+
+class PartitionedStorage():
+    '''
+    Ledger split into one file per month (or year) in a directory, plus a
+    manifest.json holding each partition's first and last date, row count
+    and per-category totals.
+
+    save() rewrites only the partitions whose entries changed, so adding an
+    expense rewrites the current month. total() and page() open only the
+    partitions a request overlaps. Entries come back grouped by partition,
+    in insertion order within each.
+    '''
+    suffix = ''
+    MANIFEST = 'manifest.json'
+    UNDATED = 'undated'
+    UNITS = {'month': 'M', 'year': 'Y'}
+
+    def __init__(self, path, freq='month', fmt='.csv'):
+        '''
+        Parameters
+        ----------
+        path : str
+            Directory holding the partitions.
+        freq : str
+            Partition size for a new ledger: 'month' or 'year'. An
+            existing ledger keeps the one in its manifest.
+        fmt : str
+            File format of the partitions of a new ledger: '.csv',
+            '.parquet' or '.feather'.
+        '''
+        if freq not in self.UNITS:
+            raise ValueError(f"Unsupported partition size: {freq}")
+        self.path = path
+        self.freq = freq
+        self.fmt = fmt
+        manifest = self.manifest()
+        if manifest is not None:
+            self.freq, self.fmt = manifest['freq'], manifest['format']
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, self.MANIFEST))
+
+    def fingerprint(self):
+        # Every save replaces the manifest.
+        stat = os.stat(os.path.join(self.path, self.MANIFEST))
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def manifest(self):
+        '''
+        Returns
+        -------
+        type: dict or None
+            {'freq', 'format', 'partitions'}, where partitions maps a key
+            ('2024-06', or 'undated' for entries without a date) to its
+            'file', 'start', 'end', 'rows', 'cents' and 'categories'
+            (category -> cents). None when the ledger does not exist yet.
+        '''
+        try:
+            with open(os.path.join(self.path, self.MANIFEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _partitions(self):
+        manifest = self.manifest()
+        if manifest is None:
+            raise FileNotFoundError(self.path)
+        return sorted(manifest['partitions'].items())
+
+    def _open(self, entry):
+        return STORAGES[self.fmt](os.path.join(self.path, entry['file']))
+
+    #-----------------------Reading--------------------------
+
+    def load(self, start=None, end=None):
+        '''
+        Reads the entries, opening only the partitions overlapping the
+        date range when one is given.
+
+        Parameters
+        ----------
+        start, end : str or pd.Timestamp, optional
+            Inclusive date bounds. Entries without a date are only
+            returned when neither is given.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+        '''
+        start, end = _bound(start), _bound(end)
+        ranged = start is not None or end is not None
+        frames = [self._open(entry).load() for key, entry in self._partitions()
+                  if not ranged or _overlaps(entry, start, end)]
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        data = pd.concat(frames, ignore_index=True)
+        if ranged:
+            dates = data['Date']
+            mask = dates.notna()
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+            data = data[mask].reset_index(drop=True)
+        return data
+
+    def count(self):
+        return sum(entry['rows'] for _, entry in self._partitions())
+
+    def total(self, start=None, end=None):
+        '''
+        Total amount of the dated entries between start and end.
+
+        Partitions entirely inside the range are summed from the manifest;
+        only the (at most two) partitions straddling a bound are opened.
+
+        Returns
+        -------
+        type: Float
+            Total in dollars.
+        '''
+        start, end = _bound(start), _bound(end)
+        cents = 0
+        for key, entry in self._partitions():
+            if not _overlaps(entry, start, end):
+                continue
+            first, last = pd.Timestamp(entry['start']), pd.Timestamp(entry['end'])
+            if (start is None or first >= start) and (end is None or last <= end):
+                cents += entry['cents']
+                continue
+            data = self._open(entry).load()
+            mask = data['Date'].notna()
+            if start is not None:
+                mask &= data['Date'] >= start
+            if end is not None:
+                mask &= data['Date'] <= end
+            cents += int(to_cents(data.loc[mask, 'Ammount']).sum())
+        return from_cents(cents)
+
+    def category_total(self, cat):
+        '''
+        Returns
+        -------
+        type: Float
+            Total amount of a category in dollars, from the manifest alone.
+        '''
+        return from_cents(sum(entry['categories'].get(cat, 0) for _, entry in self._partitions()))
+
+    def page(self, offset, limit):
+        '''
+        Returns rows offset to offset + limit in storage order, opening
+        only the partitions holding them.
+
+        Returns
+        -------
+        type: Pandas Dataframe
+        '''
+        frames = []
+        first = 0
+        for key, entry in self._partitions():
+            last = first + entry['rows']
+            if last > offset and first < offset + limit:
+                data = self._open(entry).load()
+                frames.append(data.iloc[max(offset - first, 0):offset + limit - first])
+            first = last
+            if first >= offset + limit:
+                break
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    #-----------------------Writing--------------------------
+
+    def save(self, data):
+        '''
+        Writes the ledger, rewriting only partitions whose row count or
+        totals differ from the manifest (the ledger is append-only, so
+        unchanged totals mean unchanged entries). The manifest is replaced
+        last, so a crash leaves the previous manifest in place.
+        '''
+        os.makedirs(self.path, exist_ok=True)
+        manifest = self.manifest() or {}
+        old = manifest.get('partitions', {})
+
+        dates = pd.to_datetime(data['Date'])
+        periods = dates.to_numpy(dtype='datetime64[ns]').astype(f'datetime64[{self.UNITS[self.freq]}]')
+        keys, inverse = np.unique(periods.astype(str), return_inverse=True)
+        cents = to_cents(data['Ammount'])
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(keys)))
+        by_category = pd.Series(cents).groupby([inverse, data['Category'].astype(str).to_numpy()]).sum()
+
+        partitions = {}
+        for i, key in enumerate(keys):
+            rows = order[bounds[i - 1] if i else 0:bounds[i]]
+            key = self.UNDATED if key == 'NaT' else str(key)
+            part_dates = dates.iloc[rows]
+            entry = {
+                'file': key + self.fmt,
+                'start': None if key == self.UNDATED else part_dates.min().isoformat(),
+                'end': None if key == self.UNDATED else part_dates.max().isoformat(),
+                'rows': len(rows),
+                'cents': int(cents[rows].sum()),
+                'categories': {cat: int(value) for cat, value in by_category.loc[i].items()},
+            }
+            if old.get(key) != entry or not self._open(entry).exists():
+                self._open(entry).save(data.iloc[rows])
+            partitions[key] = entry
+
+        manifest = {'freq': self.freq, 'format': self.fmt, 'partitions': partitions}
+        tmp = os.path.join(self.path, self.MANIFEST + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, self.MANIFEST))
+
+        for key, entry in old.items():
+            if key not in partitions and self._open(entry).exists():
+                os.remove(self._open(entry).path)
+
+def _bound(date):
+    return None if date is None or date == '' else pd.Timestamp(date)
+
+def _overlaps(entry, start, end):
+    # Undated partitions never overlap a date range.
+    if entry['start'] is None:
+        return False
+    return ((start is None or pd.Timestamp(entry['end']) >= start)
+            and (end is None or pd.Timestamp(entry['start']) <= end))
+
+def typed(data):
+    '''
+    Casts a ledger frame to the columnar schema.
+
+    Parameters
+    ----------
+    data : Pandas Dataframe
+        Ledger with the 'Ammount', 'Date', 'Category' and 'Notes' columns.
+
+    Returns
+    -------
+    type: Pandas Dataframe
+        Copy with numeric Ammount, datetime64 Date and categorical Category.
+    '''
+    return data.assign(
+        Category=data['Category'].astype('category'),
+        Ammount=pd.to_numeric(data['Ammount']),
+        Date=pd.to_datetime(data['Date']),
+    )
+
+def open_storage(path, migrate_from='DATA.csv'):
+    '''
+    Picks the storage backend from the file extension. A path without an
+    extension is a directory of partitions (see PartitionedStorage).
+
+    If the file does not exist yet but the legacy CSV ledger does, the CSV and
+    the entries still in its journal are converted once so existing data
+    carries over to the new format.
+
+    Parameters
+    ----------
+    path : str
+        Ledger file; '.csv', '.parquet' or '.feather', or a directory.
+    migrate_from : str
+        CSV ledger to migrate from when path is missing, relative to the
+        directory of path.
+
+    Returns
+    -------
+    type: CsvStorage
+        Storage backend for path.
+    '''
+    ext = os.path.splitext(path)[1].lower()
+    if not ext:
+        storage = PartitionedStorage(path)
+    elif ext in STORAGES:
+        storage = STORAGES[ext](path)
+    else:
+        raise ValueError(f"Unsupported ledger format: {ext}")
+
+    if not storage.exists() and migrate_from and ext != '.csv':
+        legacy = os.path.join(os.path.dirname(path), migrate_from)
+        if os.path.exists(legacy) or os.path.exists(legacy + '.journal'):
+            storage.save(_read_legacy(legacy))
+
+    return storage
+
+def _read_legacy(path):
+    # In journal mode the latest entries are only in the journal until it
+    # is compacted, so they are read back the way Manager replays them.
+    data = CsvStorage(path).load() if os.path.exists(path) else pd.DataFrame(columns=COLUMNS)
+    records = list(Journal(path + '.journal', COLUMNS, check=valid_record).replay())
+    if not records:
+        return data
+    journal = pd.DataFrame(records, columns=COLUMNS)
+    journal['Ammount'] = pd.to_numeric(journal['Ammount'])
+    journal['Date'] = parse_dates(journal['Date'])
+    return pd.concat([data, journal], ignore_index=True)
+
+def open_sidecar(path, name):
+    '''
+    Storage for a file kept next to the ledger, in the same format.
+
+    Parameters
+    ----------
+    path : str
+        Ledger file, e.g. 'DATA.csv'.
+    name : str
+        Sidecar name, e.g. 'rollups' gives 'DATA.rollups.csv' (or
+        'DATA/rollups.csv' for a partitioned ledger).
+
+    Returns
+    -------
+    type: CsvStorage
+        Storage backend for the sidecar file.
+    '''
+    root, ext = os.path.splitext(path)
+    if not ext:
+        return CsvStorage(os.path.join(path, name + CsvStorage.suffix))
+    return STORAGES[ext.lower()](f"{root}.{name}{ext}")
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from archive import Archive, write
+from indexes import DateIndex
+from manager import Manager
+from schema import enforce
+from search import NoteIndex
+
+NOTES = ['crème brûlée 🍰', '', None, '寿司 sushi', 'crème brûlée 🍰', 'plain']
+
+def ledger():
+    return enforce(pd.DataFrame({
+        'Ammount': [1.5, 2, 3, 4, 5.25, 6],
+        'Date': ['2024-03-01', '2024-01-01', None, '2024-02-01', '2024-01-15', '2024-01-01'],
+        'Category': ['Café', '食費', None, 'Café', 'Café', 'Other'],
+        'Notes': NOTES,
+    }))
+
+def test_frame_round_trip(tmp_path):
+    path = str(tmp_path / 'DATA.archive')
+    data = ledger()
+    write(path, data)
+    archive = Archive(path)
+
+    # Rows come back sorted by date, undated first, ties in ledger order.
+    order = [2, 1, 5, 4, 3, 0]
+    expected = data.iloc[order].reset_index(drop=True)
+    frame = archive.frame()
+    assert len(archive) == 6
+    assert frame['Ammount'].tolist() == expected['Ammount'].tolist()
+    assert frame['Date'].equals(expected['Date'])
+    assert frame['Category'].astype(object).tolist() == expected['Category'].astype(object).tolist()
+    assert frame['Notes'].dtype == 'string'
+    # Empty notes are stored as missing, as in the CSV.
+    assert frame['Notes'].isna().tolist() == [True, True, False, False, False, False]
+    assert frame['Notes'].tolist()[2:] == ['plain', 'crème brûlée 🍰', '寿司 sushi', 'crème brûlée 🍰']
+
+    compact = archive.frame(compact_notes=True)['Notes']
+    assert isinstance(compact.dtype, pd.CategoricalDtype)
+    assert compact.astype(object).tolist()[2:] == frame['Notes'].tolist()[2:]
+
+def test_saved_indexes_match_rebuilt_ones(tmp_path):
+    path = str(tmp_path / 'DATA.archive')
+    write(path, ledger())
+    archive = Archive(path)
+    frame = archive.frame()
+
+    dates = DateIndex.from_sorted(archive.dates, archive.cents, archive.cumsum)
+    rebuilt = DateIndex(frame['Date'], frame['Ammount'])
+    assert len(dates) == len(rebuilt) == 5
+    for start, end in ((None, None), ('2024-01-01', '2024-01-31'), ('2024-02-01', None)):
+        assert dates.range_sum(start, end) == rebuilt.range_sum(start, end)
+
+    notes = NoteIndex.from_postings(*archive.postings())
+    rebuilt = NoteIndex(frame['Notes'])
+    for query in ('brû', 'crème 🍰', '寿司', 'sush', 'pla', 'missing'):
+        assert np.array_equal(notes.lookup(query), rebuilt.lookup(query))
+
+    notes.add(6, 'plain again')
+    notes.extend(['寿司', None], 7)
+    assert notes.lookup('plain').tolist() == [2, 6]
+    assert notes.lookup('寿司').tolist() == [4, 7]
+
+def test_empty_archive(tmp_path):
+    path = str(tmp_path / 'DATA.archive')
+    write(path, ledger().iloc[:0])
+    archive = Archive(path)
+    assert len(archive) == 0
+    assert len(archive.frame()) == 0
+    assert NoteIndex.from_postings(*archive.postings()).lookup('a').tolist() == []
+
+def test_freeze_keeps_totals_and_search(tmp_path):
+    path = str(tmp_path / 'DATA.csv')
+    manager = Manager(path)
+    for amount, date, cat, notes in zip([5, 6, 7, 8], ['2023-05-01', '2022-01-01', '2024-02-01', '2023-01-01'],
+                                        ['Food'] * 4, ['café', 'rent', 'café au lait', 'bus']):
+        manager.add_entry(amount, date, cat, notes)
+    manager.export()
+    assert manager.freeze('2024-01-01') == 3
+
+    manager = Manager(path)
+    manager.add_entry(9, '2023-06-01', 'Food', 'café late')
+    assert manager.get_count() == 5
+    assert manager.get_Amount_Date('2023-01-01', '2023-12-31') == 22
+    assert sorted(manager.search('caf')['Ammount'].tolist()) == [5, 7, 9]
@@ -0,0 +1,119 @@
+import csv
+import pytest
+from journal import Journal
+from manager import Manager
+from schema import COLUMNS
+
+def write_journal(path, text):
+    with open(path, 'w', newline='') as f:
+        f.write(text)
+
+def entry(amount, date, cat='Food', notes='x'):
+    return {'Ammount': amount, 'Date': date, 'Category': cat, 'Notes': notes}
+
+def test_torn_record_is_not_merged_with_next_append(tmp_path):
+    path = str(tmp_path / 'DATA.csv.journal')
+    write_journal(path, '5,2024-01-01,Food,a\r\n12.5,2024-01-0')
+    journal = Journal(path, COLUMNS)
+    assert journal.count == 1
+
+    journal.append([entry(7, '2024-03-01')])
+    journal.close()
+
+    records = list(Journal(path, COLUMNS).replay())
+    assert [(r['Ammount'], r['Date']) for r in records] == [('5', '2024-01-01'), ('7', '2024-03-01')]
+
+def test_torn_record_without_separator(tmp_path):
+    # Appended onto "12", the next record would read as amount 127.
+    path = str(tmp_path / 'DATA.csv.journal')
+    write_journal(path, '5,2024-01-01,Food,a\r\n12')
+    journal = Journal(path, COLUMNS)
+    journal.append([entry(7, '2024-03-01')])
+    journal.close()
+
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows == [['5', '2024-01-01', 'Food', 'a'], ['7', '2024-03-01', 'Food', 'x']]
+
+def test_torn_quoted_note(tmp_path):
+    path = str(tmp_path / 'DATA.csv.journal')
+    write_journal(path, '5,2024-01-01,Food,a\r\n6,2024-01-02,Food,"two\r\nli')
+    journal = Journal(path, COLUMNS)
+    assert journal.count == 1
+    journal.append([entry(7, '2024-03-01')])
+    journal.close()
+    assert [r['Ammount'] for r in Journal(path, COLUMNS).replay()] == ['5', '7']
+
+def test_replay_checks_field_types(tmp_path):
+    path = tmp_path / 'DATA.csv'
+    path.write_text('Ammount,Date,Category,Notes\n')
+    write_journal(str(path) + '.journal',
+                  '5,2024-01-01,Food,a\r\nabc,2024-01-02,Food,b\r\n6,2024-13-45,Food,c\r\n')
+
+    manager = Manager(str(path), journal=True)
+    assert manager.get_count() == 1
+    assert manager.get_Amount_Date() == 5
+
+def test_manager_recovers_after_torn_write(tmp_path):
+    path = tmp_path / 'DATA.csv'
+    path.write_text('Ammount,Date,Category,Notes\n')
+    write_journal(str(path) + '.journal', '5,2024-01-01,Food,a\r\n12.5,2024-01-0')
+
+    manager = Manager(str(path), journal=True)
+    manager.add_entry(7, '2024-03-01', 'Food', 'b')
+    manager.close()
+
+    manager = Manager(str(path), journal=True)
+    assert manager.get_count() == 2
+    assert manager.get_Amount_Date() == 12
+    manager.close()
+
+class Crash(Exception):
+    pass
+
+def crash(*args, **kwargs):
+    raise Crash()
+
+def journal_ledger(tmp_path):
+    path = str(tmp_path / 'DATA.csv')
+    manager = Manager(path, journal=True)
+    for day in (1, 2, 3):
+        manager.add_entry(day, f'2023-01-0{day}', 'Food', 'a')
+    manager.export()
+    return path, manager
+
+def test_compact_crash_after_main_file_is_replaced(tmp_path, monkeypatch):
+    path, manager = journal_ledger(tmp_path)
+    monkeypatch.setattr(Journal, 'truncate', crash)
+    with pytest.raises(Crash):
+        manager.compact()
+    monkeypatch.undo()
+
+    manager = Manager(path, journal=True)
+    assert manager.get_count() == 3
+    assert manager.get_Amount_Date() == 6
+
+def test_compact_crash_before_main_file_is_replaced(tmp_path, monkeypatch):
+    path, manager = journal_ledger(tmp_path)
+    monkeypatch.setattr(manager.storage, 'save', crash)
+    with pytest.raises(Crash):
+        manager.compact()
+    monkeypatch.undo()
+
+    manager = Manager(path, journal=True)
+    assert manager.get_count() == 3
+    assert manager.get_Amount_Date() == 6
+
+def test_freeze_crash_before_archive_is_moved(tmp_path, monkeypatch):
+    path, manager = journal_ledger(tmp_path)
+    manager.add_entry(4, '2024-06-01', 'Food', 'b')
+    manager.export()
+    monkeypatch.setattr(Manager, '_finish_commit', crash)
+    with pytest.raises(Crash):
+        manager.freeze('2024-01-01')
+    monkeypatch.undo()
+
+    manager = Manager(path, journal=True)
+    assert manager.archived == 3
+    assert manager.get_count() == 4
+    assert manager.get_Amount_Date() == 10
@@ -0,0 +1,103 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+import time
+import pytest
+from manager import Manager
+from server import LedgerServer
+
+@pytest.fixture
+def server(tmp_path):
+    server = LedgerServer(Manager(str(tmp_path / 'DATA.csv')), port=0)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(10)
+
+def request(server, method, path, payload=None):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=10)
+    body = None if payload is None else json.dumps(payload)
+    conn.request(method, path, body)
+    response = conn.getresponse()
+    data = json.loads(response.read())
+    conn.close()
+    return response.status, data
+
+def raw_request(server, head):
+    with socket.create_connection((server.host, server.port), timeout=10) as sock:
+        sock.sendall(head)
+        return sock.recv(4096).split(b'\r\n', 1)[0]
+
+@pytest.mark.parametrize('entry', [
+    {'Ammount': 'abc', 'Date': '2024-01-01'},
+    {'Ammount': -5, 'Date': '2024-01-01'},
+    {'Ammount': 'nan', 'Date': '2024-01-01'},
+    {'Ammount': 5},
+    {'Ammount': 5, 'Date': 'not a date'},
+    [5],
+    'text',
+])
+def test_invalid_entries_are_rejected(server, entry):
+    status, data = request(server, 'POST', '/entries', entry)
+    assert status == 400
+    assert 'error' in data
+    assert server.manager.get_count() == 0
+
+def test_one_bad_entry_rejects_its_request(server):
+    status, _ = request(server, 'POST', '/entries',
+                        [{'Ammount': 5, 'Date': '2024-01-01'}, {'Ammount': 0, 'Date': '2024-01-01'}])
+    assert status == 400
+    assert server.manager.get_count() == 0
+
+@pytest.mark.parametrize('length', [b'abc', b'-1'])
+def test_invalid_content_length(server, length):
+    head = b'POST /entries HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n'
+    assert raw_request(server, head) == b'HTTP/1.1 400 Bad Request'
+
+def test_unknown_routes(server):
+    assert request(server, 'GET', '/nothing')[0] == 404
+    assert request(server, 'GET', '/entries')[0] == 405
+
+def test_concurrent_posts_are_batched(server):
+    batches = []
+    write = server._write
+
+    def slow_write(rows):
+        # Holds the writer so the other posts queue up behind it.
+        batches.append(len(rows))
+        time.sleep(0.2)
+        write(rows)
+
+    server._write = slow_write
+    posts = 20
+    results = [None] * posts
+
+    def post(i):
+        results[i] = request(server, 'POST', '/entries',
+                             {'Ammount': i + 1, 'Date': f'2024-01-{i + 1:02d}', 'Category': 'Food'})
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(posts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert results == [(200, {'added': 1})] * posts
+    assert sum(batches) == posts
+    assert len(batches) < posts
+    assert request(server, 'GET', '/history?limit=0')[1]['count'] == posts
+    assert request(server, 'GET', '/totals/range')[1]['total'] == sum(range(1, posts + 1))
@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+from storage import CsvStorage, PartitionedStorage
+
+def ledger(rows):
+    return pd.DataFrame(rows, columns=['Ammount', 'Date', 'Category', 'Notes'])
+
+def record_saves(monkeypatch):
+    saved = []
+    save = CsvStorage.save
+
+    def recording(self, data):
+        saved.append(os.path.basename(self.path))
+        save(self, data)
+
+    monkeypatch.setattr(CsvStorage, 'save', recording)
+    return saved
+
+ROWS = [
+    (5, '2024-01-03', 'Food', 'a'),
+    (6, '2024-02-10', 'Rent', 'b'),
+    (7, '2024-03-15', 'Food', 'c'),
+]
+
+def test_save_rewrites_only_changed_partitions(tmp_path, monkeypatch):
+    storage = PartitionedStorage(str(tmp_path / 'DATA'))
+    storage.save(ledger(ROWS))
+    saved = record_saves(monkeypatch)
+
+    storage.save(ledger(ROWS + [(8, '2024-02-11', 'Food', 'd')]))
+    assert saved == ['2024-02.csv']
+    assert storage.count() == 4
+    assert storage.total('2024-02-01', '2024-02-29') == 14
+
+    saved.clear()
+    storage.save(ledger(ROWS + [(8, '2024-02-11', 'Food', 'd')]))
+    assert saved == []
+
+def test_save_removes_dropped_partitions(tmp_path):
+    storage = PartitionedStorage(str(tmp_path / 'DATA'))
+    storage.save(ledger(ROWS))
+    assert os.path.exists(tmp_path / 'DATA' / '2024-03.csv')
+
+    storage.save(ledger(ROWS[:2]))
+    assert not os.path.exists(tmp_path / 'DATA' / '2024-03.csv')
+    assert sorted(storage.manifest()['partitions']) == ['2024-01', '2024-02']
+    assert storage.load()['Ammount'].tolist() == [5, 6]